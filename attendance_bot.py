@@ -1,32 +1,133 @@
+from telegram import Update
 from telegram.ext import Updater
+from telegram.error import RetryAfter, TelegramError
 import logging
+import threading
+import time
 from handlers import Handlers
+import metrics
+from render_cache import RenderCache
+from send_queue import SendQueue
 
 class AttendanceBot:
-    def __init__(self, config, repo):
+    def __init__(self, config, cohorts):
         self.TOKEN = config.bot_api
         self.config = config
-        self.repository = repo  
+        self.cohorts = cohorts
+        self.updater = None
         self.pending_users = {}
         self.removed_users = {}
+        self.render_cache = RenderCache(config.render_cache_max_bytes)
+        self.send_queue = SendQueue(config.telegram_global_rate, config.telegram_group_rate,
+                                    config.telegram_private_rate, config.telegram_max_retries,
+                                    config.telegram_answer_workers)
 
     def initialize(self):
-        updater = Updater(token=self.TOKEN, use_context=True)
+        """Starts the dispatcher and job queue and points the Telegram webhook at the API server.
+
+        Updates arrive through process_update; the bot runs no HTTP server of its own.
+        """
+        updater = Updater(token=self.TOKEN, use_context=True, workers=self.config.workers)
         dispatcher = updater.dispatcher
 
+        self.send_queue.start()
+
         handlers = Handlers(self, dispatcher)
         handlers.setup_handlers()
 
         # log all errors
         dispatcher.add_error_handler(self.error)
 
-        updater.start_webhook(listen="0.0.0.0", port=self.config.port, url_path=self.TOKEN)
-        updater.bot.setWebhook(f'{self.config.server_url}/{self.TOKEN}')
-        updater.idle()
+        metrics.job_queue_depth.set_function(lambda: len(updater.job_queue.jobs()))
+
+        interval = self.config.participant_index_refresh_interval
+        updater.job_queue.run_repeating(self.refresh_participants, interval=interval, first=interval)
+        interval = self.config.score_refresh_interval
+        updater.job_queue.run_repeating(self.refresh_scores, interval=interval, first=interval)
+        interval = self.config.attendance_flush_interval
+        updater.job_queue.run_repeating(self.flush_attendance, interval=interval, first=interval)
+        if self.config.snapshot_path:
+            interval = self.config.snapshot_interval
+            updater.job_queue.run_repeating(self.save_snapshot, interval=interval, first=interval)
+
+        updater.job_queue.start()
+        threading.Thread(target=dispatcher.start, name="dispatcher", daemon=True).start()
+        self.updater = updater
+
+        self.set_webhook()
+
+    def set_webhook(self):
+        """Points the Telegram webhook at the API server, retrying webhook_retries times.
+
+        Raises the last error if every attempt fails: without the webhook no update ever arrives,
+        so startup fails rather than leaving the bot running deaf.
+        """
+        for attempt in range(1, self.config.webhook_retries + 1):
+            try:
+                self.updater.bot.set_webhook(
+                    url=f'{self.config.server_url.rstrip("/")}{self.config.webhook_path}',
+                    api_kwargs={"secret_token": self.config.webhook_secret},
+                )
+                return
+            except TelegramError as e:
+                if attempt == self.config.webhook_retries:
+                    raise
+                wait = e.retry_after if isinstance(e, RetryAfter) else self.config.webhook_retry_interval
+                logging.getLogger(__name__).warning('Setting the webhook failed, retrying in %ss: "%s"', wait, e)
+                time.sleep(wait)
+
+    def shutdown(self):
+        if self.updater:
+            self.updater.stop()
+        self.flush_attendance(None)  # Write marks still buffered at shutdown
+        self.save_snapshot(None)
+
+    def process_update(self, data):
+        """Hands a webhook payload to the dispatcher. Returns False if the bot isn't running yet."""
+        if not self.updater:
+            return False
+        update = Update.de_json(data, self.updater.bot)
+        if update:
+            self.updater.update_queue.put(update)
+        return True
+
+    def repository_for(self, chat_id):
+        """Returns the repository of the cohort a chat belongs to."""
+        return self.cohorts.for_chat(chat_id)
+
+    def refresh_participants(self, context):
+        for repository in self.cohorts.repositories():
+            try:
+                repository.refresh_participants()
+            except Exception as e:
+                logging.getLogger(__name__).warning('Refreshing participant index of %s failed: "%s"', repository.spreadsheet_name, e)
+
+    def refresh_scores(self, context):
+        for repository in self.cohorts.repositories():
+            try:
+                repository.refresh_scores()
+            except Exception as e:
+                logging.getLogger(__name__).warning('Refreshing score snapshot of %s failed: "%s"', repository.spreadsheet_name, e)
+
+    def flush_attendance(self, context):
+        for repository in self.cohorts.repositories():
+            try:
+                repository.flush_attendance()
+            except Exception as e:
+                logging.getLogger(__name__).warning('Flushing attendance of %s failed, will retry: "%s"', repository.spreadsheet_name, e)
+
+    def save_snapshot(self, context):
+        for repository in self.cohorts.repositories():
+            try:
+                repository.save_snapshot()
+            except Exception as e:
+                logging.getLogger(__name__).warning('Saving the disk snapshot of %s failed: "%s"', repository.spreadsheet_name, e)
 
     def error(self, update, context):
         logger = logging.getLogger(__name__)
         logger.warning('Update "%s" caused error "%s"', update, context.error)
+        if isinstance(context.error, TelegramError):
+            metrics.telegram_errors.labels(type(context.error).__name__).inc()
     
     def start(self, update, context):
         update.message.reply_text(f"Welcome to the {self.config.bot_name}! \n"
@@ -0,0 +1,203 @@
+"""Benchmarks Repository and C2Repository against an in-memory fake of Google Sheets.
+
+    python -m benchmarks.bench_repository [--sizes 100 1000] [--latency 0.05] [--quota 300] [--storage sqlite] [--update-baseline]
+
+Each operation runs once on a fresh repository (cold) and then --repeat more times (warm).
+The Sheets round-trips and wall time of both are reported. The run exits with status 1 if
+an operation needs more round-trips than benchmarks/baseline.json allows.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from config import Config
+from benchmarks.fake_sheets import FakeClient
+from repository.base_repository import BaseRepository
+from repository.c2repository import C2Repository
+from repository.repository import Repository
+from repository.spreadsheets import SpreadsheetCache
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+ASSIGNMENT_SHEETS = [f"assignment{number}" for number in range(1, 11)]
+WORKSHEETS = ("participants_sheet", "assignments_sheet", "recordings_sheet",
+              "resources_sheet", "score_sheet", "score_rules_sheet")
+
+
+def build_client(size, latency, quota):
+    """Builds a fake client holding a cohort of size participants. Even rows have a linked Telegram ID."""
+    participants = [["Full Name", "Email address", "Payment Reference", "Telegram ID", "Attendance - Jan 01"]]
+    scores = [["Full Name", "Email address", "Attendance", "pre-assessment", "msword1", "msword2",
+               "msword4", "msexcel", "sum", "status"]]
+    registrations = [["firstname", "lastname", "email", "phone", "created_at"]]
+    for i in range(size):
+        name = f"First{i} Middle{i} Last{i}"
+        telegram_id = str(telegram_id_of(i)) if i % 2 == 0 else ""
+        participants.append([name, email_of(i), f"REF{i}", telegram_id, ""])
+        scores.append([name, email_of(i), "50", "5", "8", "8", "8", "8", "87", "Eligible"])
+        registrations.append([f"First{i}", f"Last{i}", f"reg{i}@example.com", f"080{i:08d}", "2025-01-01 00:00:00"])
+    sheets = {
+        "participants": participants,
+        "score_sheet": scores,
+        "score_rules": [["Rule", "", "", "Total"], ["Assignments", "", "", "100"]],
+        "assignments": [["Date", "Title", "Deadline", "Submission link", "Sheet", "Score"]] + [
+            ["Jan 01", f"Assignment {sheet}", "Jan 08", "https://example.com", sheet, "10"] for sheet in ASSIGNMENT_SHEETS
+        ],
+        "resources": [["Title", "Location", "Link"]] + [[f"Resource {i}", "Drive", "https://example.com"] for i in range(20)],
+        "recordings": [["Title", "Link"]] + [[f"Session {i}", "https://example.com"] for i in range(20)],
+    }
+    for sheet in ASSIGNMENT_SHEETS:
+        sheets[sheet] = [["Email address", "Score"]] + [[email_of(i), "8"] for i in range(size)]
+    client = FakeClient(latency=latency, quota_per_minute=quota)
+    client.add_spreadsheet("bench", sheets)
+    client.add_spreadsheet("bench-c2", {"registration": registrations})
+    return client
+
+
+def email_of(i):
+    return f"user{i}@example.com"
+
+
+def telegram_id_of(i):
+    return 100000 + i
+
+
+def fresh_repositories(client, workdir=None):
+    """Returns a Repository subclass and a C2Repository with empty caches and handles opened.
+
+    With the sqlite backend each call gets a new mirror file in workdir, the system temp directory if not given.
+    """
+    BaseRepository.client = client
+    BaseRepository.spreadsheets = SpreadsheetCache(client, Config.max_open_spreadsheets)
+    if Config.storage_backend == "sqlite":
+        handle, Config.sqlite_path = tempfile.mkstemp(suffix=".sqlite3", dir=workdir)
+        os.close(handle)
+    repository = Repository.for_spreadsheet("bench")
+    for name in WORKSHEETS:
+        getattr(repository, name)
+    c2_repository = C2Repository("bench-c2")
+    c2_repository.get_worksheet("registration")
+    return repository, c2_repository
+
+
+def operations(size):
+    linked = lambda i: telegram_id_of((2 * i) % size)
+    unlinked = lambda i: email_of((2 * i + 1) % size)
+
+    def mark_and_flush(repository, i):
+        repository.mark_attendance(linked(i))
+        repository.flush_attendance()
+
+    def register(c2_repository, i):
+        data = {"firstname": "New", "lastname": f"Person{i}", "email": f"new{i}-{time.time()}@example.com", "phone": "0800"}
+        return c2_repository.register_participant(data).result(timeout=30)
+
+    return [
+        ("get_member_by_telegram_id", lambda r, c, i: r.get_member_by_telegram_id(linked(i))),
+        ("find_member_by_telegram_id", lambda r, c, i: r.find_member_by_telegram_id(linked(i))),
+        ("telegram_id_exists", lambda r, c, i: r.telegram_id_exists(linked(i))),
+        ("find_participant_by_payment_reference", lambda r, c, i: r.find_participant_by_payment_reference(f"REF{i % size}")),
+        ("find_participant_by_name", lambda r, c, i: r.find_participant_by_name(f"first{i % size} middle{i % size}")),
+        ("update_telegram_id_by_email", lambda r, c, i: r.update_telegram_id_by_email(unlinked(i), 900000 + i)),
+        ("mark_attendance", lambda r, c, i: r.mark_attendance(linked(i))),
+        ("mark_and_flush_attendance", lambda r, c, i: mark_and_flush(r, i)),
+        ("get_assignments", lambda r, c, i: r.get_assignments()),
+        ("get_resources", lambda r, c, i: r.get_resources()),
+        ("get_recordings", lambda r, c, i: r.get_recordings()),
+        ("get_scores", lambda r, c, i: r.get_scores(ASSIGNMENT_SHEETS, email_of(i % size))),
+        ("get_overall_score", lambda r, c, i: r.get_overall_score(email_of(i % size))),
+        ("exists_in_google_sheet", lambda r, c, i: c.exists_in_google_sheet("email", f"reg{i % size}@example.com", "registration")),
+        ("register_participant", lambda r, c, i: register(c, i)),
+    ]
+
+
+def measure(client, fn):
+    calls = client.total_calls
+    started = time.perf_counter()
+    fn()
+    return client.total_calls - calls, time.perf_counter() - started
+
+
+def run(size, latency, quota, repeat, workdir=None):
+    client = build_client(size, latency, quota)
+    results = {}
+    for name, operation in operations(size):
+        repository, c2_repository = fresh_repositories(client, workdir)
+        cold_calls, cold_time = measure(client, lambda: operation(repository, c2_repository, 0))
+        warm_calls = warm_time = 0
+        for i in range(1, repeat + 1):
+            calls, seconds = measure(client, lambda: operation(repository, c2_repository, i))
+            warm_calls += calls
+            warm_time += seconds
+        results[name] = {
+            "cold_calls": cold_calls,
+            "warm_calls": warm_calls / repeat,
+            "cold_ms": cold_time * 1000,
+            "warm_ms": warm_time * 1000 / repeat,
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every fake Sheets call")
+    parser.add_argument("--quota", type=int, default=None, help="Fake Sheets calls allowed per minute")
+    parser.add_argument("--storage", choices=["sheets", "sqlite"], default="sheets",
+                        help="Storage backend; with sqlite, writes stay in the outbox for the whole run")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    # Mirrors and the journal live in a directory removed after the run; the settings and the shared
+    # client are put back so nothing of the fake outlives it
+    settings = ("registration_journal_path", "registration_flush_interval", "cohort2sheet", "storage_backend",
+                "sqlite_path", "sqlite_sync_interval", "sqlite_pull_interval")
+    saved_settings = {name: getattr(Config, name) for name in settings}
+    # Read from the class dict: the attributes are lazy and would open a real Google client
+    saved_client = vars(BaseRepository)["client"], vars(BaseRepository)["spreadsheets"]
+    with tempfile.TemporaryDirectory(prefix="bench_repository-") as workdir:
+        try:
+            Config.registration_journal_path = os.path.join(workdir, "registration_journal.jsonl")
+            Config.registration_flush_interval = 0.01
+            Config.cohort2sheet = "bench-c2"
+            Config.storage_backend = args.storage
+            Config.sqlite_sync_interval = Config.sqlite_pull_interval = 3600
+
+            worst = {}
+            print(f"{'participants':>12} {'operation':<40} {'cold calls':>10} {'warm calls':>10} {'cold ms':>10} {'warm ms':>10}")
+            for size in args.sizes:
+                for name, result in run(size, args.latency, args.quota, args.repeat, workdir).items():
+                    print(f"{size:>12} {name:<40} {result['cold_calls']:>10} {result['warm_calls']:>10.2f} "
+                          f"{result['cold_ms']:>10.2f} {result['warm_ms']:>10.3f}")
+                    calls = worst.setdefault(name, {"cold": 0, "warm": 0})
+                    calls["cold"] = max(calls["cold"], result["cold_calls"])
+                    calls["warm"] = max(calls["warm"], result["warm_calls"])
+        finally:
+            for name, value in saved_settings.items():
+                setattr(Config, name, value)
+            BaseRepository.client, BaseRepository.spreadsheets = saved_client
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w") as baseline_file:
+            json.dump(worst, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    with open(BASELINE_PATH) as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = [
+        f"{name} {phase}: {calls[phase]:g} round-trips, baseline allows {baseline[name][phase]:g}"
+        for name, calls in worst.items() if name in baseline
+        for phase in ("cold", "warm") if calls[phase] > baseline[name][phase] + 1e-9
+    ]
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+import functools
+import threading
+import time
+from collections import Counter, deque
+
+import requests
+from gspread.cell import Cell
+from gspread.exceptions import APIError, WorksheetNotFound
+from gspread.utils import a1_to_rowcol
+
+
+def api_call(fn):
+    """Counts a fake method as one Sheets round-trip, applying the client's latency and quota."""
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        self.client.record(fn.__name__)
+        return fn(self, *args, **kwargs)
+    return wrapper
+
+
+class FakeClient:
+    """In-memory stand-in for gspread.Client with per-call latency and a per-minute quota."""
+
+    def __init__(self, spreadsheets=None, latency=0.0, quota_per_minute=None):
+        self.spreadsheets = spreadsheets or {}
+        self.latency = latency
+        self.quota_per_minute = quota_per_minute
+        self.calls = Counter()
+        self.recent = deque()
+        self.lock = threading.Lock()
+        self.client = self
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def record(self, name):
+        with self.lock:
+            now = time.monotonic()
+            while self.recent and now - self.recent[0] > 60:
+                self.recent.popleft()
+            if self.quota_per_minute is not None and len(self.recent) >= self.quota_per_minute:
+                raise quota_error()
+            self.recent.append(now)
+            self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    @api_call
+    def open(self, title):
+        return self.spreadsheets[title]
+
+    @api_call
+    def open_by_key(self, key):
+        return self.spreadsheets[key]
+
+    def add_spreadsheet(self, title, sheets):
+        spreadsheet = FakeSpreadsheet(self, title)
+        for name, values in sheets.items():
+            spreadsheet.add_worksheet(name, values)
+        self.spreadsheets[title] = spreadsheet
+        return spreadsheet
+
+
+def quota_error():
+    response = requests.Response()
+    response.status_code = 429
+    response._content = b'{"error": {"code": 429, "message": "Quota exceeded", "status": "RESOURCE_EXHAUSTED"}}'
+    return APIError(response)
+
+
+class FakeSpreadsheet:
+    def __init__(self, client, title):
+        self.client = client
+        self.title = title
+        self.id = title
+        self.sheets = {}
+
+    def add_worksheet(self, title, values):
+        self.sheets[title] = FakeWorksheet(self.client, title, values)
+        return self.sheets[title]
+
+    @api_call
+    def worksheets(self):
+        return list(self.sheets.values())
+
+    @api_call
+    def worksheet(self, title):
+        try:
+            return self.sheets[title]
+        except KeyError:
+            raise WorksheetNotFound(title)
+
+    @api_call
+    def values_batch_get(self, ranges, params=None):
+        value_ranges = []
+        for cell_range in ranges:
+            name, _, cells = cell_range.partition("!")
+            sheet = self.sheets[name.strip("'").replace("''", "'")]
+            values = sheet.values_in(cells) if cells else sheet.trimmed_rows()
+            value_ranges.append({"range": cell_range, "values": values})
+        return {"spreadsheetId": self.title, "valueRanges": value_ranges}
+
+
+class FakeWorksheet:
+    """The subset of gspread.Worksheet the repositories use, backed by a list of rows."""
+
+    def __init__(self, client, title, values):
+        self.client = client
+        self.title = title
+        self.rows = [list(row) for row in values]
+        self.col_count = max((len(row) for row in self.rows), default=0) or 26
+
+    def _cell(self, row, col):
+        if row <= len(self.rows) and col <= len(self.rows[row - 1]):
+            return self.rows[row - 1][col - 1]
+        return ""
+
+    def _set(self, row, col, value):
+        while len(self.rows) < row:
+            self.rows.append([])
+        cells = self.rows[row - 1]
+        if len(cells) < col:
+            cells.extend([""] * (col - len(cells)))
+        cells[col - 1] = str(value)
+        self.col_count = max(self.col_count, col)
+
+    def trimmed_rows(self):
+        rows = [list(row) for row in self.rows]
+        for row in rows:
+            while row and row[-1] == "":
+                row.pop()
+        return rows
+
+    def values_in(self, cells):
+        start, _, end = cells.partition(":")
+        start_row, start_col = a1_to_rowcol(start)
+        end_row, end_col = a1_to_rowcol(end) if end else (start_row, start_col)
+        return [
+            [self._cell(row, col) for col in range(start_col, end_col + 1)]
+            for row in range(start_row, end_row + 1)
+        ]
+
+    @api_call
+    def get_all_values(self):
+        width = max((len(row) for row in self.rows), default=0)
+        return [row + [""] * (width - len(row)) for row in self.rows]
+
+    @api_call
+    def get_all_records(self):
+        if not self.rows:
+            return []
+        header = self.rows[0]
+        return [dict(zip(header, row + [""] * (len(header) - len(row)))) for row in self.rows[1:]]
+
+    @api_call
+    def row_values(self, row):
+        return self.trimmed_rows()[row - 1] if row <= len(self.rows) else []
+
+    @api_call
+    def col_values(self, col):
+        values = [self._cell(row, col) for row in range(1, len(self.rows) + 1)]
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    @api_call
+    def find(self, query, in_column=None):
+        for row_number, row in enumerate(self.rows, start=1):
+            for col_number, value in enumerate(row, start=1):
+                if in_column and col_number != in_column:
+                    continue
+                if value == query:
+                    return Cell(row_number, col_number, value)
+        return None
+
+    @api_call
+    def cell(self, row, col):
+        return Cell(row, col, self._cell(row, col))
+
+    @api_call
+    def acell(self, label):
+        row, col = a1_to_rowcol(label)
+        return Cell(row, col, self._cell(row, col))
+
+    @api_call
+    def update_cell(self, row, col, value):
+        self._set(row, col, value)
+
+    @api_call
+    def batch_update(self, data, **kwargs):
+        for update in data:
+            start = update["range"].split("!")[-1].split(":")[0]
+            start_row, start_col = a1_to_rowcol(start)
+            for row_offset, values in enumerate(update["values"]):
+                for col_offset, value in enumerate(values):
+                    self._set(start_row + row_offset, start_col + col_offset, value)
+
+    @api_call
+    def append_row(self, values, **kwargs):
+        self.rows.append([str(value) for value in values])
+
+    @api_call
+    def append_rows(self, values, **kwargs):
+        self.rows.extend([str(value) for value in row] for row in values)
+
+    @api_call
+    def add_cols(self, cols):
+        self.col_count += cols
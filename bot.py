@@ -1,21 +1,60 @@
-from fastapi import FastAPI
+import asyncio
+import hmac
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from pydantic import BaseModel
 
 from config import Config
-from repository.c2repository import C2Repository
-from repository.repository import Repository
+from repository.async_repository import AsyncRepository, RepositoryBusy, RepositoryTimeout
+from repository.cohorts import CohortRegistry, UnknownCohort
+from repository.warmup import Warmup
 from attendance_bot import AttendanceBot
-import threading
 
 app = FastAPI()
 
-attendance_checker = AttendanceBot(Config, Repository)
-c2_repository = C2Repository()
+cohorts = CohortRegistry(Config.cohorts, Config.cohort_chats, Config.default_cohort,
+                         Config.registration_cohort, Config.registration_journal_path)
+attendance_checker = AttendanceBot(Config, cohorts)
+api_repository = AsyncRepository(cohorts, Config.api_max_workers, Config.api_max_pending, Config.api_timeout)
+warmup = Warmup(Config.warmup_retry_interval)
+
+@app.on_event("startup")
+async def start_warmup():
+    # Answer from the last disk snapshot until the warm-up has reloaded everything from the sheets
+    cohorts.load_snapshots()
+    # Sheets handles open in the background so the server starts listening right away
+    warmup.start(cohorts.warm_up_steps())
+
+@app.on_event("startup")
+async def start_bot():
+    # set_webhook is a blocking call
+    await asyncio.get_running_loop().run_in_executor(None, attendance_checker.initialize)
+
+@app.on_event("shutdown")
+async def stop_bot():
+    await asyncio.get_running_loop().run_in_executor(None, attendance_checker.shutdown)
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, ex):
     return {"message": "An unexpected error occurred", "success": False}
 
+@app.exception_handler(RepositoryBusy)
+async def repository_busy_handler(request, ex):
+    return JSONResponse(
+        status_code=503,
+        content={"message": "Server is busy, please try again shortly", "success": False},
+        headers={"Retry-After": str(Config.api_retry_after)},
+    )
+
+@app.exception_handler(UnknownCohort)
+async def unknown_cohort_handler(request, ex):
+    return JSONResponse(status_code=404, content={"message": f"Unknown cohort {ex.args[0]}", "success": False})
+
+@app.exception_handler(RepositoryTimeout)
+async def repository_timeout_handler(request, ex):
+    return JSONResponse(status_code=504, content={"message": "Request timed out, please try again", "success": False})
+
 class RegisterDlbRequest(BaseModel):
     firstname: str
     lastname: str
@@ -34,28 +73,79 @@ class RegisterDlbRequest(BaseModel):
     referral: str
     will_commit: bool
     created_at: str
+    cohort: str | None = None
 
 class CheckExistRequest(BaseModel):
     column: str
     value: str
     sheet: str | None
+    cohort: str | None = None
+
+class ExistsCheck(BaseModel):
+    column: str
+    value: str
+
+class BulkCheckExistRequest(BaseModel):
+    checks: list[ExistsCheck]
+    sheet: str | None = None
+    cohort: str | None = None
+
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    return JSONResponse(status_code=200 if warmup.ready else 503, content=warmup.report())
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+@app.post(Config.webhook_path)
+async def telegram_webhook(request: Request):
+    secret = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+    if not hmac.compare_digest(secret, Config.webhook_secret):
+        return Response(status_code=403)
+    if not attendance_checker.process_update(await request.json()):
+        return Response(status_code=503)  # Telegram retries until the bot is up
+    return Response(status_code=200)
 
 @app.post("/register-dlb")
 async def register_dlb(data: RegisterDlbRequest):
-    success = c2_repository.register_participant(data.model_dump())
-    return {"message": "Registration successful", "success": success}
+    registration = await api_repository.call("register_participant", data.model_dump(exclude={"cohort"}), data.cohort)
+    try:
+        appended = await asyncio.wait_for(asyncio.wrap_future(registration), Config.registration_ack_timeout)
+    except asyncio.TimeoutError:
+        # Already journaled, so it will reach the sheet once the next batch goes through
+        return {"message": "Registration received", "success": True}
+    if not appended:
+        return {"message": "You are already registered", "success": True}
+    return {"message": "Registration successful", "success": True}
 
 @app.post("/check-exists")
 async def check_exist(data: CheckExistRequest):
-    exists = c2_repository.exists_in_google_sheet(data.column, data.value, data.sheet)
+    exists = await api_repository.call("exists_in_google_sheet", data.column, data.value, data.sheet, data.cohort)
     return {"message": "Checked completed", "success": True, "data": {"exists": exists}}
 
+@app.post("/check-exists/bulk")
+async def check_exists_bulk(data: BulkCheckExistRequest):
+    checks = [(check.column, check.value) for check in data.checks]
+    results = await api_repository.call("exists_many", checks, data.sheet, data.cohort)
+    return {
+        "message": "Checked completed",
+        "success": True,
+        "data": {"results": [
+            {"column": column, "value": value, "exists": exists}
+            for (column, value), exists in zip(checks, results)
+        ]}
+    }
+
 
 def main():
     import uvicorn
-    api_thread = threading.Thread(target=lambda: uvicorn.run(app, host="0.0.0.0", port=8000))
-    api_thread.start()
-    attendance_checker.initialize()
+    # The API and the Telegram webhook share one server
+    uvicorn.run(app, host="0.0.0.0", port=Config.port)
 
 
 if __name__ == '__main__':
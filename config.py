@@ -1,5 +1,7 @@
 #!/usr/bin/python3
 
+import hashlib
+import hmac
 import os
 from dotenv import load_dotenv
 import logging
@@ -7,6 +9,18 @@ import logging
 logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
 load_dotenv()
 
+
+def pairs(value):
+    """Parses "key=value,key=value" into a dictionary."""
+    items = (item.partition("=") for item in (value or "").split(",") if item.strip())
+    return {key.strip(): name.strip() for key, _, name in items}
+
+
+def derived_secret(token, purpose):
+    """Derives a stable secret from the bot token, the same on every start and every instance."""
+    return hmac.new((token or "").encode(), purpose.encode(), hashlib.sha256).hexdigest()
+
+
 class Config:
     port = int(os.environ.get('PORT', 5000))
     bot_api = os.environ.get("bot_api", None) 
@@ -17,4 +31,63 @@ class Config:
     cohort2sheet=os.environ.get("cohort2sheet", None)
     bot_name = os.environ.get("bot_name", "DND Bot")
     GROUP_LINK = os.environ.get("GROUP_LINK", "https://t.me/your_group_link_here")
+    participant_index_refresh_interval = int(os.environ.get("participant_index_refresh_interval", 300))
+    attendance_flush_interval = int(os.environ.get("attendance_flush_interval", 5))
+    score_refresh_interval = int(os.environ.get("score_refresh_interval", 300))
+    score_cache_ttl = int(os.environ.get("score_cache_ttl", 300))
+    listing_cache_ttl = int(os.environ.get("listing_cache_ttl", 600))
+    render_cache_max_bytes = int(os.environ.get("render_cache_max_bytes", 4 * 1024 * 1024))
+    listing_page_size = int(os.environ.get("listing_page_size", 10))  # Entries per /resources and /recordings page
+    # Trigram similarity for suggesting registered names to unlinked users; 0 turns suggestions off
+    name_match_threshold = float(os.environ.get("name_match_threshold", 0))
+    sweep_interval = int(os.environ.get("sweep_interval", 50))
+    sweep_get_chat_limit = int(os.environ.get("sweep_get_chat_limit", 20))
+    api_max_workers = int(os.environ.get("api_max_workers", 8))
+    api_max_pending = int(os.environ.get("api_max_pending", 32))
+    api_timeout = float(os.environ.get("api_timeout", 20))
+    api_retry_after = int(os.environ.get("api_retry_after", 5))
+    registration_journal_path = os.environ.get("registration_journal_path", "registration_journal.jsonl")
+    registration_batch_size = int(os.environ.get("registration_batch_size", 50))
+    registration_flush_interval = float(os.environ.get("registration_flush_interval", 2))
+    registration_ack_timeout = float(os.environ.get("registration_ack_timeout", 10))
+    column_index_ttl = int(os.environ.get("column_index_ttl", 300))  # Seconds before column values and headers are read again
+    warmup_retry_interval = int(os.environ.get("warmup_retry_interval", 30))
+    sheets_reads_per_minute = int(os.environ.get("sheets_reads_per_minute", 60))
+    sheets_writes_per_minute = int(os.environ.get("sheets_writes_per_minute", 60))
+    sheets_max_retries = int(os.environ.get("sheets_max_retries", 5))
+    sheets_backoff_base = float(os.environ.get("sheets_backoff_base", 1))
+    sheets_backoff_max = float(os.environ.get("sheets_backoff_max", 32))
+    sheets_pool_size = int(os.environ.get("sheets_pool_size", 16))  # Keep-alive connections to Google per host
+    sheets_keepalive = int(os.environ.get("sheets_keepalive", 60))  # TCP keep-alive probe interval, 0 to turn off
+    sheets_token_refresh_margin = int(os.environ.get("sheets_token_refresh_margin", 300))  # Seconds before expiry
+    telegram_global_rate = float(os.environ.get("telegram_global_rate", 30))  # Calls per second across all chats
+    telegram_group_rate = float(os.environ.get("telegram_group_rate", 20))  # Messages per minute in one group
+    telegram_private_rate = float(os.environ.get("telegram_private_rate", 1))  # Messages per second in one private chat
+    telegram_max_retries = int(os.environ.get("telegram_max_retries", 3))
+    telegram_answer_workers = int(os.environ.get("telegram_answer_workers", 4))  # Threads sending callback answers
+    webhook_path = os.environ.get("webhook_path", "/telegram/webhook")
+    # Telegram sends it back with every update; derived from the bot token if unset, so a restart
+    # whose set_webhook fails still accepts updates sent with the secret registered before
+    webhook_secret = os.environ.get("webhook_secret") or derived_secret(bot_api, "webhook_secret")
+    webhook_retries = int(os.environ.get("webhook_retries", 5))  # set_webhook attempts before startup fails
+    webhook_retry_interval = float(os.environ.get("webhook_retry_interval", 5))
+    workers = int(os.environ.get("workers", 8))  # Threads running run_async handlers
+    storage_backend = os.environ.get("storage_backend", "sheets")  # "sheets" or "sqlite"
+    sqlite_path = os.environ.get("sqlite_path", "sheets_mirror.sqlite3")
+    sqlite_sync_interval = float(os.environ.get("sqlite_sync_interval", 5))
+    sqlite_pull_interval = float(os.environ.get("sqlite_pull_interval", 60))
+    import_chunk_size = int(os.environ.get("import_chunk_size", 500))
+    snapshot_path = os.environ.get("snapshot_path", "sheets_snapshot.jsonl.gz")  # Empty disables the snapshot
+    snapshot_interval = int(os.environ.get("snapshot_interval", 300))
+    snapshot_max_age = int(os.environ.get("snapshot_max_age", 86400))  # Older snapshots are not loaded
+    max_open_spreadsheets = int(os.environ.get("max_open_spreadsheets", 8))
+    # Cohort ID -> spreadsheet name; the defaults keep gsheet_name and cohort2sheet working as before
+    cohorts = pairs(os.environ.get("cohorts")) or {
+        cohort: name for cohort, name in (("default", gsheet_name), ("cohort2", cohort2sheet)) if name
+    }
+    cohort_chats = pairs(os.environ.get("cohort_chats"))  # Telegram chat ID -> cohort ID
+    default_cohort = os.environ.get("default_cohort", "default")  # Chats not in cohort_chats
+    registration_cohort = os.environ.get("registration_cohort", "cohort2")  # /register-dlb without a cohort
+    refresh_cooldown = int(os.environ.get("refresh_cooldown", 60))  # Seconds between two /refresh commands
+    admin_ids = [int(admin_id) for admin_id in os.environ.get("admin_ids", "").split(",") if admin_id.strip()]
 
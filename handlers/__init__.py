@@ -5,6 +5,9 @@ from handlers.recording_handler import RecordingHandler
 from handlers.member_handler import MemberHandler
 from handlers.score_handler import OverallScoreHandler
 from handlers.payment_member_handler import PaymentMemberHandler
+from handlers.admin_handler import AdminHandler
+from handlers.member_sweeper import MemberSweeper
+from metrics import instrument_handlers
 
 class Handlers:
     def __init__(self, bot, dispatcher):
@@ -19,4 +22,7 @@ class Handlers:
         MemberHandler(self.bot, self.dispatcher).setup()
         PaymentMemberHandler(self.bot, self.dispatcher).setup()
         OverallScoreHandler(self.bot, self.dispatcher).setup()
+        AdminHandler(self.bot, self.dispatcher).setup()
+        MemberSweeper(self.bot, self.dispatcher).setup()
+        instrument_handlers(self.dispatcher)
     
\ No newline at end of file
@@ -0,0 +1,96 @@
+import threading
+import time
+from telegram.ext import CommandHandler
+from config import Config
+from send_queue import BROADCAST, NOTICE
+from utils import is_bot_admin
+
+class AdminHandler:
+    def __init__(self, bot, dispatcher):
+        self.bot = bot
+        self.dispatcher = dispatcher
+        self.refresh_lock = threading.Lock()
+        self.last_refresh = None  # monotonic time of the last /refresh
+
+    def setup(self):
+        self.dispatcher.add_handler(CommandHandler("refresh", self.refresh, run_async=True))
+        self.dispatcher.add_handler(CommandHandler("broadcast", self.broadcast, run_async=True))
+        self.dispatcher.add_handler(CommandHandler("import_participants", self.import_participants, run_async=True))
+
+    def refresh(self, update, context):
+        if not is_bot_admin(update):
+            update.message.reply_text("This command can be executed by admin only")
+            return
+        # Every refresh re-reads all worksheets out of the read quota every user shares
+        with self.refresh_lock:
+            now = time.monotonic()
+            if self.last_refresh is not None and now - self.last_refresh < Config.refresh_cooldown:
+                wait = Config.refresh_cooldown - (now - self.last_refresh)
+                update.message.reply_text(f"⏳ Data was just reloaded. Try again in {wait:.0f}s.")
+                return
+            self.last_refresh = now
+        try:
+            for repository in self.bot.cohorts.repositories():
+                repository.refresh()
+            self.bot.cohorts.forget_registration_sheets()
+            update.message.reply_text("🔄 Assignments, resources, recordings, scores and participants reloaded.")
+        except Exception as e:
+            update.message.reply_text(f"⚠️ Error refreshing data: {str(e)}")
+
+    def import_participants(self, update, context):
+        """Upserts participants from Config.participant_csv_path; paths from the chat are never opened."""
+        if not is_bot_admin(update):
+            update.message.reply_text("This command can be executed by admin only")
+            return
+        path = Config.participant_csv_path
+        if not path:
+            update.message.reply_text("⚠️ participant_csv_path is not set.")
+            return
+        update.message.reply_text("📥 Importing participants...")
+        try:
+            stats = self.bot.repository_for(update.effective_chat.id).import_participants(path)
+        except Exception as e:
+            update.message.reply_text(f"⚠️ Import stopped: {str(e)}\nRun the command again to resume.")
+            return
+        update.message.reply_text(
+            f"✅ Import finished: {stats['rows']} rows read, {stats['added']} added, "
+            f"{stats['updated']} updated, {stats['skipped']} skipped without an email."
+        )
+
+    def broadcast(self, update, context):
+        """Sends the text after /broadcast to every linked participant through the send queue."""
+        if not is_bot_admin(update):
+            update.message.reply_text("This command can be executed by admin only")
+            return
+        text = update.message.text.partition(" ")[2].strip()
+        if not text:
+            update.message.reply_text("Usage: /broadcast <message>")
+            return
+        try:
+            telegram_ids = self.bot.repository_for(update.effective_chat.id).linked_telegram_ids()
+        except Exception as e:
+            update.message.reply_text(f"⚠️ Error loading participants: {str(e)}")
+            return
+        if not telegram_ids:
+            update.message.reply_text("📭 No linked participants to message.")
+            return
+
+        chat_id = update.effective_chat.id
+        lock = threading.Lock()
+        results = {"sent": 0, "failed": 0}
+
+        def done(future):
+            with lock:
+                results["failed" if future.exception() else "sent"] += 1
+                finished = results["sent"] + results["failed"] == len(telegram_ids)
+            if finished:
+                self.bot.send_queue.submit(
+                    NOTICE, chat_id, context.bot.send_message, chat_id=chat_id,
+                    text=f"📣 Broadcast finished: {results['sent']} sent, {results['failed']} failed."
+                )
+
+        update.message.reply_text(f"📣 Broadcasting to {len(telegram_ids)} participants...")
+        for telegram_id in telegram_ids:
+            self.bot.send_queue.submit(
+                BROADCAST, telegram_id, context.bot.send_message, chat_id=telegram_id, text=text
+            ).add_done_callback(done)
\ No newline at end of file
@@ -12,56 +12,14 @@ class AssignmentHandler:
 
     def get_assignment(self, update, context):
         try:
-            assignments = self.bot.repository.get_assignments()
-            telegram_id = update.effective_user.id
-            can_view_score = False
-            member = None
-            member_email = None
-
-            try:
-                member = self.bot.repository.get_member_by_telegram_id(telegram_id)
-
-                if member:
-                    member_email = member.get('Email address')
-                    if member_email:  # If email is present, they can view scores
-                        can_view_score = True
-            except ValueError:
-                update.message.reply_text(
-                    "⚠️ Your Telegram is not linked, so your scores may not be visible.\n"
-                    "👉 Run /validate_me to link your Telegram.",
-                    reply_to_message_id=update.message.message_id
-                )
-
-            if not assignments:
-                update.message.reply_text("📌 No assignments available at the moment.")
-                return
-
-            message = "<b>📚 List of all assignments</b>\n\n"
-
-            for assignment in assignments:
-                assignment_sheet = assignment['Sheet'].strip()
-                score = self.bot.repository.get_score(assignment_sheet, member_email) if member else None
-                assignment_score = assignment['Score']
-                icon = '&#10060;' if score is None or score == 0 else '&#9989;'
-
-                if '/' in str(score):
-                    score, _ = str(score).split('/')
-
-                # Score display logic
-                score_text = (
-                    f"{icon} <b>Score:</b> <code>{score}{'/' + str(assignment_score)}</code>"
-                    if score is not None else
-                    "&#10060; <b>Score:</b> Not available"
-                )
-
-                # Assignment details
-                message += (
-                    f"📌 <b>{assignment['Date']}: {assignment['Title']}</b>\n"
-                    f"<i>Due on {assignment['Deadline']} | "
-                    f"<a href='{assignment['Submission link']}'>View Assignment</a></i>\n"
-                    f"{score_text}\n\n"
-                )
-            message += "\n⚠️ <i>Late submissions result in half marks.</i>"
+            # Linked members get the same reply until the data behind it is reloaded
+            repository = self.bot.repository_for(update.effective_chat.id)
+            cache_key = (update.effective_user.id, "assignments", repository.cohort)
+            message = self.bot.render_cache.get(cache_key, repository.assignments_version())
+            if message is None:
+                message = self.render_assignments(update, repository)
+                if message is None:
+                    return
 
             update.message.reply_text(
                 message,
@@ -72,3 +30,68 @@ class AssignmentHandler:
 
         except Exception as e:
             update.message.reply_text(f"⚠️ Error retrieving assignments: {str(e)}")
+
+    def render_assignments(self, update, repository):
+        """Builds the /assignments reply, or returns None after replying that there is nothing to show."""
+        version = repository.assignments_version()
+        assignments = repository.get_assignments()
+        telegram_id = update.effective_user.id
+        can_view_score = False
+        member = None
+        member_email = None
+
+        try:
+            member = repository.get_member_by_telegram_id(telegram_id)
+
+            if member:
+                member_email = member.get('Email address')
+                if member_email:  # If email is present, they can view scores
+                    can_view_score = True
+        except ValueError:
+            update.message.reply_text(
+                "⚠️ Your Telegram is not linked, so your scores may not be visible.\n"
+                "👉 Run /validate_me to link your Telegram.",
+                reply_to_message_id=update.message.message_id
+            )
+
+        if not assignments:
+            update.message.reply_text("📌 No assignments available at the moment.")
+            return None
+
+        scores = {}
+        if member:
+            # One batched read covers every assignment sheet
+            assignment_sheets = [assignment['Sheet'].strip() for assignment in assignments]
+            scores = repository.get_scores(assignment_sheets, member_email)
+
+        parts = ["<b>📚 List of all assignments</b>\n\n"]
+
+        for assignment in assignments:
+            assignment_sheet = assignment['Sheet'].strip()
+            score = scores.get(assignment_sheet, 0) if member else None
+            assignment_score = assignment['Score']
+            icon = '&#10060;' if score is None or score == 0 else '&#9989;'
+
+            if '/' in str(score):
+                score, _ = str(score).split('/')
+
+            # Score display logic
+            score_text = (
+                f"{icon} <b>Score:</b> <code>{score}{'/' + str(assignment_score)}</code>"
+                if score is not None else
+                "&#10060; <b>Score:</b> Not available"
+            )
+
+            # Assignment details
+            parts.append(
+                f"📌 <b>{assignment['Date']}: {assignment['Title']}</b>\n"
+                f"<i>Due on {assignment['Deadline']} | "
+                f"<a href='{assignment['Submission link']}'>View Assignment</a></i>\n"
+                f"{score_text}\n\n"
+            )
+        parts.append("\n⚠️ <i>Late submissions result in half marks.</i>")
+        message = "".join(parts)
+
+        if member:
+            self.bot.render_cache.put((telegram_id, "assignments", repository.cohort), version, message)
+        return message
@@ -1,15 +1,40 @@
 from telegram.ext import CommandHandler, CallbackQueryHandler, Filters
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ParseMode
+import logging
+import threading
+from send_queue import ANSWER
+
+class AttendanceSession:
+    """An attendance running in one chat, with its own sheet column and message."""
+
+    def __init__(self, chat_id):
+        self.chat_id = chat_id
+        self.column = None  # Set once the sheet column exists
+        self.message_id = None
+        self.attendees = 0
+        self.lock = threading.Lock()
+
+    def count_attendee(self):
+        """Adds one to the attendee count and returns the new count."""
+        with self.lock:
+            self.attendees += 1
+            return self.attendees
+
 
 class AttendanceHandler:
     def __init__(self, bot, dispatcher):
         self.bot = bot
         self.dispatcher = dispatcher
+        self.sessions = {}  # chat_id -> AttendanceSession
+        self.sessions_lock = threading.Lock()
+        # Present taps run on the worker pool; a user's taps still run one at a time. The locks are
+        # striped by user ID, so their number stays fixed however many users tap
+        self.user_locks = [threading.Lock() for _ in range(64)]
 
     def setup(self):
         self.dispatcher.add_handler(CommandHandler('start', self.start, run_async=True))
         self.dispatcher.add_handler(CommandHandler("start_attendance", self.start_attendance, Filters.chat_type.groups, run_async=True))
-        self.dispatcher.add_handler(CallbackQueryHandler(self.mark_attendance, pattern='^present$'))
+        self.dispatcher.add_handler(CallbackQueryHandler(self.mark_attendance, pattern='^present$', run_async=True))
         self.dispatcher.add_handler(CallbackQueryHandler(self.end_attendance, pattern='^end_attendance$'))
 
     def start(self, update, context):
@@ -20,51 +45,80 @@ class AttendanceHandler:
     def start_attendance(self, update, context):
         original_member = context.bot.get_chat_member(update.effective_chat.id, update.effective_user.id)
         if original_member['status'] in ('creator', 'administrator'):
-            if 'flag' in context.chat_data and context.chat_data['flag'] == 1:
-                update.message.reply_text("Please close the current attendance first")
+            chat_id = update.effective_chat.id
+            with self.sessions_lock:
+                if chat_id in self.sessions:
+                    update.message.reply_text("Please close the current attendance first")
+                    return
+                session = self.sessions[chat_id] = AttendanceSession(chat_id)
+            try:
+                session.column = self.bot.repository_for(update.effective_chat.id).create_new_attendance_col()
+            except Exception as e:
+                with self.sessions_lock:
+                    del self.sessions[chat_id]
+                logging.getLogger(__name__).warning('Creating the attendance column failed: "%s"', e)
+                update.message.reply_text("Couldn't start the attendance right now. Please try again in a minute.")
                 return
-            elif 'flag' not in context.chat_data or context.chat_data['flag'] == 0:
-                self.bot.repository.create_new_attendance_col()
-                context.chat_data['flag'] = 1
-                context.chat_data['attendees'] = 0
-                context.chat_data['id'] = update.effective_chat.id
-                keyboard = [
-                    [InlineKeyboardButton("Present", callback_data='present')],
-                    [InlineKeyboardButton("End Attendance (Admin only)", callback_data='end_attendance')]
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                self.message = update.message.reply_text("Please mark your attendance", reply_markup=reply_markup)
+            keyboard = [
+                [InlineKeyboardButton("Present", callback_data='present')],
+                [InlineKeyboardButton("End Attendance (Admin only)", callback_data='end_attendance')]
+            ]
+            reply_markup = InlineKeyboardMarkup(keyboard)
+            try:
+                message = update.message.reply_text("Please mark your attendance", reply_markup=reply_markup)
+            except Exception:
+                # Nobody can tap Present on a message that was never sent, so the admin must be able to start again
+                with self.sessions_lock:
+                    del self.sessions[chat_id]
+                raise
+            session.message_id = message.message_id
         else:
             pass
 
     def mark_attendance(self, update, context):
         query = update.callback_query
+        session = self.sessions.get(update.effective_chat.id)
+        if session is None or session.column is None:
+            self.bot.send_queue.submit(ANSWER, None, context.bot.answer_callback_query, callback_query_id=query.id, text="This attendance is already closed.", show_alert=True)
+            return
+        user_lock = self.user_locks[update.effective_user.id % len(self.user_locks)]
         try:
-            if self.bot.repository.mark_attendance(update.effective_user.id):
-                context.chat_data['attendees'] += 1
-                context.bot.answer_callback_query(callback_query_id=query.id, text=f"You are the #{context.chat_data['attendees']} to mark attendance.\n Score : 10 marks", show_alert=True)
+            with user_lock:
+                marked = self.bot.repository_for(update.effective_chat.id).mark_attendance(update.effective_user.id, column=session.column)
+            if marked:
+                position = session.count_attendee()
+                self.bot.send_queue.submit(ANSWER, None, context.bot.answer_callback_query, callback_query_id=query.id, text=f"You are the #{position} to mark attendance.\n Score : 10 marks", show_alert=True)
             else:
-                context.bot.answer_callback_query(callback_query_id=query.id, text="Your attendance is already marked", show_alert=True)
+                self.bot.send_queue.submit(ANSWER, None, context.bot.answer_callback_query, callback_query_id=query.id, text="Your attendance is already marked", show_alert=True)
+        except ValueError:
+            self.bot.send_queue.submit(ANSWER, None, context.bot.answer_callback_query, callback_query_id=query.id, text="Error marking attendance. Seems like your telegram is yet to be linked. Please use /validate_me command to link your telegram and try again", show_alert=True)
         except Exception as e:
-            context.bot.answer_callback_query(callback_query_id=query.id, text="Error marking attendance. Seems like your telegram is yet to be linked. Please use /validate_me command to link your telegram and try again", show_alert=True)
-        query.answer()
+            # Sheets is busy or unreachable; /validate_me would only add load
+            logging.getLogger(__name__).warning('Marking attendance failed: "%s"', e)
+            self.bot.send_queue.submit(ANSWER, None, context.bot.answer_callback_query, callback_query_id=query.id, text="We couldn't record your attendance right now. Please tap Present again in a minute.", show_alert=True)
 
     def end_attendance(self, update, context):
         query = update.callback_query
         original_member = context.bot.get_chat_member(update.effective_chat.id, update.effective_user.id)
         if original_member['status'] in ('creator', 'administrator'):
-            if context.chat_data['id'] != update.effective_chat.id:
-                return
-            attendance_count = context.chat_data['attendees']
-            query.answer()
-            context.bot.edit_message_text(
-                text=f"Attendance is over. \n{attendance_count} participants marked attendance.\n",
-                chat_id=self.message.chat_id,
-                message_id=self.message.message_id,
+            with self.sessions_lock:
+                session = self.sessions.get(update.effective_chat.id)
+                if session is None or session.message_id is None:
+                    self.bot.send_queue.submit(ANSWER, None, context.bot.answer_callback_query, callback_query_id=query.id)
+                    return
+                del self.sessions[session.chat_id]
+            self.bot.send_queue.submit(ANSWER, None, context.bot.answer_callback_query, callback_query_id=query.id)
+            try:
+                self.bot.repository_for(update.effective_chat.id).finish_attendance(session.column)
+            except Exception as e:
+                # Unwritten marks stay buffered and the periodic flush retries them
+                logging.getLogger(__name__).warning('Flushing attendance failed: "%s"', e)
+            self.bot.send_queue.submit(
+                ANSWER, session.chat_id, context.bot.edit_message_text,
+                text=f"Attendance is over. \n{session.attendees} participants marked attendance.\n",
+                chat_id=session.chat_id,
+                message_id=session.message_id,
                 parse_mode=ParseMode.MARKDOWN
             )
-            context.chat_data['flag'] = 0
-            context.chat_data['attendees'] = 0
         else:
-            context.bot.answer_callback_query(callback_query_id=query.id, text="This command can be executed by admin only", show_alert=True)
-            query.answer()
\ No newline at end of file
+            self.bot.send_queue.submit(ANSWER, None, context.bot.answer_callback_query, callback_query_id=query.id, text="This command can be executed by admin only", show_alert=True)
\ No newline at end of file
@@ -0,0 +1,110 @@
+from telegram import ParseMode
+from telegram.error import TelegramError
+from config import Config
+import metrics
+import logging
+import time
+from send_queue import MODERATION, NOTICE
+
+class MemberSweeper:
+    """Checks every pending and removed user in one periodic pass instead of a job per user."""
+
+    def __init__(self, bot, dispatcher):
+        self.bot = bot
+        self.dispatcher = dispatcher
+        self.logger = logging.getLogger(__name__)
+        self.last_stats = {}
+        self.linked_ids = {}  # repository -> Telegram IDs linked in it, for the current pass
+
+    def setup(self):
+        interval = Config.sweep_interval
+        self.dispatcher.job_queue.run_repeating(self.sweep, interval=interval, first=interval, name="member_sweeper")
+
+    def sweep(self, context):
+        if not self.bot.pending_users and not self.bot.removed_users:
+            return
+        started = time.monotonic()
+        stats = {
+            "pending": len(self.bot.pending_users),
+            "removed": len(self.bot.removed_users),
+            "get_chat": 0, "linked": 0, "kicked": 0, "unbanned": 0, "deferred": 0, "errors": 0,
+        }
+        # Lookups use the participant index, which is reloaded on its own schedule; a pass reads no sheet
+        chat_ids = {user_data["chat_id"] for user_data in list(self.bot.pending_users.values()) + list(self.bot.removed_users.values())}
+        self.linked_ids = {}
+        for repository in {self.bot.repository_for(chat_id) for chat_id in chat_ids}:
+            try:
+                self.linked_ids[repository] = set(repository.linked_telegram_ids())
+            except Exception as e:
+                self.logger.error(f"Member sweep could not load linked Telegram IDs of {repository.spreadsheet_name}: {e}")
+
+        # Users checked longest ago go first, so users deferred by the get_chat budget get their turn next
+        users = [(user_id, user_data, False) for user_id, user_data in list(self.bot.pending_users.items())]
+        users += [(user_id, user_data, True) for user_id, user_data in list(self.bot.removed_users.items())]
+        users.sort(key=lambda user: user[1].get("checked_at", 0))
+        for user_id, user_data, removed in users:
+            needs_get_chat = user_data.get("check", "name") == "name"
+            if needs_get_chat and stats["get_chat"] >= Config.sweep_get_chat_limit:
+                stats["deferred"] += 1
+                continue
+            user_data["checked_at"] = time.monotonic()
+            try:
+                if needs_get_chat:
+                    stats["get_chat"] += 1
+                if removed:
+                    self.check_removed_user(context, user_id, user_data, stats)
+                else:
+                    self.check_pending_user(context, user_id, user_data, stats)
+            except Exception as e:
+                if isinstance(e, TelegramError):
+                    metrics.telegram_errors.labels(type(e).__name__).inc()
+                stats["errors"] += 1
+                self.logger.error(f"Error checking name update for {user_id}: {e}")
+                (self.bot.removed_users if removed else self.bot.pending_users).pop(user_id, None)
+
+        stats["duration"] = round(time.monotonic() - started, 3)
+        self.last_stats = stats
+        metrics.sweep_duration.observe(stats["duration"])
+        metrics.sweep_users.labels("pending").set(len(self.bot.pending_users))
+        metrics.sweep_users.labels("removed").set(len(self.bot.removed_users))
+        self.logger.info(f"Member sweep: {stats}")
+
+    def check_pending_user(self, context, user_id, user_data, stats):
+        chat_id = user_data["chat_id"]
+        attempts = user_data["attempts"]
+        member = context.bot.get_chat(user_id)
+        telegram_name = f"{member.first_name} {member.last_name or ''}".strip().lower()
+        mention = f"[{member.first_name}](tg://user?id={user_id})"
+        if self.bot.repository_for(chat_id).update_telegram_id(telegram_name, user_id):
+            self.bot.send_queue.submit(NOTICE, chat_id, context.bot.send_message, chat_id=chat_id, text=f"✅ Thank you, {mention}! 🎉\n\nYour name is now correct", parse_mode=ParseMode.MARKDOWN)
+            del self.bot.pending_users[user_id]
+            stats["linked"] += 1
+        else:
+            user_data["attempts"] += 1
+            if attempts >= 5:
+                self.bot.send_queue.submit(NOTICE, chat_id, context.bot.send_message, chat_id=chat_id, text=f"🚨 {mention} was removed for **not updating their name**.\n\n💡 Please update your name before rejoining the group.", parse_mode=ParseMode.MARKDOWN)
+                self.bot.send_queue.submit(MODERATION, None, context.bot.kick_chat_member, chat_id, user_id)
+                self.bot.removed_users[user_id] = {"chat_id": chat_id, "user_id": user_id, "attempts": 0, "check": "name"}
+                del self.bot.pending_users[user_id]
+                stats["kicked"] += 1
+
+    def check_removed_user(self, context, user_id, user_data, stats):
+        chat_id = user_data["chat_id"]
+        attempts = user_data["attempts"]
+        if user_data.get("check", "name") == "telegram_id":
+            # Removed for an unlinked Telegram ID: let them back in once /validate_me links it
+            if user_id in self.linked_ids.get(self.bot.repository_for(chat_id), ()):
+                self.bot.send_queue.submit(MODERATION, None, context.bot.unban_chat_member, chat_id=chat_id, user_id=user_id)
+                del self.bot.removed_users[user_id]
+                stats["unbanned"] += 1
+            return
+        member = context.bot.get_chat(user_id)
+        telegram_name = f"{member.first_name} {member.last_name or ''}".strip().lower()
+        if self.bot.repository_for(chat_id).update_telegram_id(telegram_name, user_id):
+            self.bot.send_queue.submit(MODERATION, None, context.bot.unban_chat_member, chat_id=chat_id, user_id=user_id)
+            del self.bot.removed_users[user_id]
+            stats["unbanned"] += 1
+        else:
+            user_data["attempts"] += 1
+            if attempts >= 10:
+                del self.bot.removed_users[user_id]
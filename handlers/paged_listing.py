@@ -0,0 +1,125 @@
+import logging
+from abc import ABC, abstractmethod
+from telegram.ext import CommandHandler, CallbackQueryHandler
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ParseMode
+from config import Config
+from send_queue import ANSWER, NOTICE
+
+# Telegram rejects messages over 4096 characters; the rest is left for the page footer
+MAX_PAGE_LENGTH = 4000
+
+
+class PagedListingHandler(ABC):
+    """Replies to a listing command with one page and Prev/Next buttons that edit the same message.
+
+    Pages are rendered once per version of the listing and kept in the render cache, so turning a
+    page only reads memory. Subclasses set the command and texts and implement load, version and
+    format_entry.
+    """
+
+    command = None
+    title = None
+    empty_text = None
+    error_text = None
+
+    def __init__(self, bot, dispatcher):
+        self.bot = bot
+        self.dispatcher = dispatcher
+
+    def setup(self):
+        self.dispatcher.add_handler(CommandHandler(self.command, self.get_listing))
+        self.dispatcher.add_handler(CallbackQueryHandler(self.turn_page, pattern=rf'^{self.command}:\d+$'))
+
+    @abstractmethod
+    def load(self, repository):
+        """Returns the listing's entries."""
+
+    @abstractmethod
+    def version(self, repository):
+        """Returns a stamp of the loaded listing, or None if it is missing or expired."""
+
+    @abstractmethod
+    def format_entry(self, entry):
+        """Returns the Markdown text of one entry."""
+
+    def get_listing(self, update, context):
+        try:
+            pages = self.pages(self.bot.repository_for(update.effective_chat.id))
+            if not pages:
+                context.bot.send_message(chat_id=update.effective_chat.id, text=self.empty_text)
+                return
+            context.bot.send_message(
+                chat_id=update.effective_chat.id,
+                text=self.page_text(pages, 0),
+                parse_mode=ParseMode.MARKDOWN,
+                disable_web_page_preview=True,
+                reply_markup=self.keyboard(pages, 0),
+            )
+        except Exception as e:
+            context.bot.send_message(chat_id=update.effective_chat.id, text=f"{self.error_text}: {str(e)}")
+
+    def turn_page(self, update, context):
+        query = update.callback_query
+        self.bot.send_queue.submit(ANSWER, None, context.bot.answer_callback_query, callback_query_id=query.id)
+        chat_id = update.effective_chat.id
+        try:
+            pages = self.pages(self.bot.repository_for(chat_id))
+        except Exception as e:
+            logging.getLogger(__name__).warning('Loading /%s failed: "%s"', self.command, e)
+            return
+        if not pages:
+            self.bot.send_queue.submit(NOTICE, chat_id, context.bot.edit_message_text, text=self.empty_text,
+                                       chat_id=chat_id, message_id=query.message.message_id)
+            return
+        # The listing may have shrunk since the buttons were sent
+        page = min(int(query.data.partition(":")[2]), len(pages) - 1)
+        # Edits wait on the chat's limit, so turning pages fast can't use up the budget of attendance answers
+        self.bot.send_queue.submit(
+            NOTICE, chat_id, context.bot.edit_message_text,
+            text=self.page_text(pages, page),
+            chat_id=chat_id,
+            message_id=query.message.message_id,
+            parse_mode=ParseMode.MARKDOWN,
+            disable_web_page_preview=True,
+            reply_markup=self.keyboard(pages, page),
+        )
+
+    def pages(self, repository):
+        """Returns the rendered pages of the listing, from the render cache while its data is unchanged."""
+        cache_key = (self.command, repository.cohort)
+        pages = self.bot.render_cache.get(cache_key, self.version(repository))
+        if pages is None:
+            version = self.version(repository)  # Taken before the read so a reload in between isn't cached
+            pages = self.render(self.load(repository))
+            self.bot.render_cache.put(cache_key, version, pages)
+        return pages
+
+    def render(self, entries):
+        """Splits entries into pages of at most Config.listing_page_size entries that fit one message."""
+        header = f"📚 *{self.title}*\n\n"
+        length_limit = MAX_PAGE_LENGTH - len(header)
+        pages, parts, length = [], [], 0
+        for entry in entries:
+            text = self.format_entry(entry)
+            if parts and (len(parts) >= Config.listing_page_size or length + len(text) > length_limit):
+                pages.append(header + "".join(parts))
+                parts, length = [], 0
+            parts.append(text)
+            length += len(text)
+        if parts:
+            pages.append(header + "".join(parts))
+        return pages
+
+    @staticmethod
+    def page_text(pages, page):
+        if len(pages) == 1:
+            return pages[0]
+        return f"{pages[page]}_Page {page + 1} of {len(pages)}_"
+
+    def keyboard(self, pages, page):
+        buttons = []
+        if page > 0:
+            buttons.append(InlineKeyboardButton("◀️ Prev", callback_data=f"{self.command}:{page - 1}"))
+        if page < len(pages) - 1:
+            buttons.append(InlineKeyboardButton("Next ▶️", callback_data=f"{self.command}:{page + 1}"))
+        return InlineKeyboardMarkup([buttons]) if buttons else None
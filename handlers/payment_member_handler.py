@@ -1,13 +1,13 @@
 from telegram.ext import CommandHandler, MessageHandler, Filters
 from telegram import ParseMode
 from config import Config
+from send_queue import MODERATION, NOTICE
 
 class PaymentMemberHandler:
     def __init__(self, bot, dispatcher):
         self.bot = bot
         self.dispatcher = dispatcher
         self.group_link = Config.GROUP_LINK
-        self.removed_users = {}  # Track removed users for unban logic
 
     def setup(self):
         self.dispatcher.add_handler(CommandHandler("validate_me", self.validate_payment))
@@ -22,11 +22,13 @@ class PaymentMemberHandler:
             chat_id = update.effective_chat.id
             user_id = member.id
             mention = f"[{member.first_name}](tg://user?id={user_id})"
+            self.bot.cohorts.remember_join(user_id, chat_id)
             # Only allow if Telegram ID is linked
-            if self.bot.repository.find_member_by_telegram_id(user_id):
-                context.bot.send_message(chat_id=chat_id, text=f"✅ Welcome, {mention}! You are verified.", parse_mode=ParseMode.MARKDOWN)
+            if self.bot.repository_for(update.effective_chat.id).find_member_by_telegram_id(user_id):
+                self.bot.send_queue.submit(NOTICE, chat_id, context.bot.send_message, chat_id=chat_id, text=f"✅ Welcome, {mention}! You are verified.", parse_mode=ParseMode.MARKDOWN)
             else:
-                warning_msg = context.bot.send_message(
+                self.bot.send_queue.submit(
+                    NOTICE, chat_id, context.bot.send_message,
                     chat_id=chat_id,
                     text=(
                         f"🚫 Hi {mention}, you are not in our registered records.\n\n"
@@ -35,26 +37,9 @@ class PaymentMemberHandler:
                     ),
                     parse_mode=ParseMode.MARKDOWN
                 )
-                context.bot.kick_chat_member(chat_id, user_id)
-                self.removed_users[user_id] = {"chat_id": chat_id, "user_id": user_id, "attempts": 0}
-                context.job_queue.run_repeating(self.check_removed_users, interval=60, first=60, context=user_id, name=str(user_id))
-
-    def check_removed_users(self, context):
-        job = context.job
-        user_id = int(job.name)
-        if user_id not in self.removed_users:
-            job.schedule_removal()
-            return
-        user_data = self.removed_users[user_id]
-        chat_id = user_data["chat_id"]
-        try:
-            # If user is now validated, unban them
-            if self.bot.repository.find_member_by_telegram_id(user_id):
-                context.bot.unban_chat_member(chat_id=chat_id, user_id=user_id)
-                del self.removed_users[user_id]
-                job.schedule_removal()
-        except Exception as e:
-            job.schedule_removal()
+                self.bot.send_queue.submit(MODERATION, None, context.bot.kick_chat_member, chat_id, user_id)
+                # MemberSweeper unbans them once their Telegram ID is linked
+                self.bot.removed_users[user_id] = {"chat_id": chat_id, "user_id": user_id, "attempts": 0, "check": "telegram_id"}
 
     def validate_payment(self, update, context):
         chat_id = update.effective_chat.id
@@ -83,7 +68,8 @@ class PaymentMemberHandler:
         chat_id = update.effective_chat.id
         telegram_id = update.effective_user.id
         try:
-            email, row = self.bot.repository.find_participant_by_payment_reference(payment_reference)
+            repository = self.bot.cohorts.for_payment_reference(chat_id, payment_reference)
+            email, row = repository.find_participant_by_payment_reference(payment_reference)
             if not email:
                 update.message.reply_text(
                     "❌ Payment reference not found. Please check and try again.",
@@ -91,7 +77,7 @@ class PaymentMemberHandler:
                 )
                 return
             # Update Telegram ID for this email
-            success = self.bot.repository.update_telegram_id_by_email(email, telegram_id)
+            success = repository.update_telegram_id_by_email(email, telegram_id)
             if not success:
                 update.message.reply_text(
                     "⚠️ Could not update your Telegram ID. Please contact support.",
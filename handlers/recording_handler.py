@@ -1,23 +1,16 @@
-from telegram.ext import CommandHandler
-from telegram import ParseMode
+from handlers.paged_listing import PagedListingHandler
 
-class RecordingHandler:
-    def __init__(self, bot, dispatcher):
-        self.bot = bot
-        self.dispatcher = dispatcher
+class RecordingHandler(PagedListingHandler):
+    command = "recordings"
+    title = "List of all session recording link"
+    empty_text = "📌 No session recordings available at the moment."
+    error_text = "⚠️ Error recordings"
 
-    def setup(self):
-        self.dispatcher.add_handler(CommandHandler("recordings", self.get_recordings))
+    def load(self, repository):
+        return repository.get_recordings()
 
-    def get_recordings(self, update, context):
-        try:
-            recordings = self.bot.repository.get_recordings()
-            if not recordings:
-                context.bot.send_message(chat_id=update.effective_chat.id, text="📌 No session recordings available at the moment.")
-                return
-            message = "📚 *List of all session recording link*\n\n"
-            for recording in recordings:
-                message += f"📌 *{recording['Title']}*\n🔗 [Go to Video]({recording['Link']})\n\n"
-            context.bot.send_message(chat_id=update.effective_chat.id, text=message, parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True)
-        except Exception as e:
-            context.bot.send_message(chat_id=update.effective_chat.id, text=f"⚠️ Error recordings: {str(e)}")
\ No newline at end of file
+    def version(self, repository):
+        return repository.listing_version("recordings")
+
+    def format_entry(self, recording):
+        return f"📌 *{recording['Title']}*\n🔗 [Go to Video]({recording['Link']})\n\n"
@@ -0,0 +1,91 @@
+import functools
+import threading
+import time
+from urllib.parse import unquote
+
+from prometheus_client import Counter, Gauge, Histogram
+
+handler_latency = Histogram(
+    "bot_handler_latency_seconds", "Time spent in Telegram update handlers", ["handler", "command"]
+)
+sheets_calls = Counter(
+    "sheets_api_calls_total", "Google Sheets API requests", ["method", "worksheet", "http_method"]
+)
+sheets_latency = Histogram(
+    "sheets_api_latency_seconds", "Google Sheets API request latency", ["http_method"]
+)
+sheets_connect_latency = Histogram(
+    "sheets_connect_seconds", "Time to open a connection to Google, TCP and TLS handshakes included"
+)
+sheets_token_refresh_latency = Histogram("sheets_token_refresh_seconds", "Time to refresh the Sheets access token")
+sheets_token_ttl = Gauge("sheets_token_ttl_seconds", "Seconds until the Sheets access token expires")
+cache_requests = Counter("cache_requests_total", "Cache lookups by result", ["cache", "result"])
+job_queue_depth = Gauge("job_queue_depth", "Jobs scheduled on the Telegram job queue")
+send_queue_depth = Gauge("telegram_send_queue_depth", "Telegram API calls waiting in the send queue")
+telegram_errors = Counter("telegram_errors_total", "Errors returned by the Telegram Bot API", ["error"])
+sweep_duration = Histogram("member_sweep_duration_seconds", "Duration of a member sweep pass")
+sweep_users = Gauge("member_sweep_users", "Users waiting on the member sweeper", ["state"])
+
+_current = threading.local()
+
+
+def tracked(fn):
+    """Labels the Sheets calls made inside fn with its name."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        previous = getattr(_current, "method", None)
+        _current.method = fn.__name__
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.method = previous
+    return wrapper
+
+
+def record_sheets_call(http_method, endpoint, seconds):
+    method = getattr(_current, "method", None) or "unknown"
+    sheets_calls.labels(method, worksheet_label(endpoint), http_method.upper()).inc()
+    sheets_latency.labels(http_method.upper()).observe(seconds)
+
+
+def worksheet_label(endpoint):
+    """Extracts the worksheet name from a Sheets API URL, or describes the call when there is none."""
+    if "googleapis.com/drive" in endpoint:
+        return "drive"
+    if "/values/" not in endpoint:
+        return "batch" if ":batch" in endpoint else "metadata"
+    cell_range = unquote(endpoint.split("/values/", 1)[1])
+    if "!" in cell_range:
+        sheet = cell_range.split("!", 1)[0]
+    else:
+        sheet = cell_range.split(":", 1)[0] if cell_range.endswith((":append", ":clear")) else cell_range
+    return sheet.strip("'").replace("''", "'")
+
+
+def instrument_handlers(dispatcher):
+    """Wraps every registered handler callback so its latency is recorded."""
+    for handlers in dispatcher.handlers.values():
+        for handler in handlers:
+            if getattr(handler.callback, "instrumented", False):
+                continue
+            owner = getattr(handler.callback, "__self__", None)
+            name = type(owner).__name__ if owner is not None else handler.callback.__name__
+            if hasattr(handler, "command"):
+                command = handler.command[0]
+            elif getattr(handler, "pattern", None) is not None:
+                command = getattr(handler.pattern, "pattern", handler.pattern)
+            else:
+                command = handler.callback.__name__
+            handler.callback = _timed(handler.callback, handler_latency.labels(name, command))
+
+
+def _timed(callback, histogram):
+    @functools.wraps(callback)
+    def wrapper(*args, **kwargs):
+        started = time.monotonic()
+        try:
+            return callback(*args, **kwargs)
+        finally:
+            histogram.observe(time.monotonic() - started)
+    wrapper.instrumented = True
+    return wrapper
@@ -0,0 +1,47 @@
+import threading
+from collections import OrderedDict
+
+import metrics
+
+
+class RenderCache:
+    """LRU cache of rendered replies, each stored with the version of the data it was built from.
+
+    A lookup only hits when the caller's current version matches the stored one. The least
+    recently used replies are evicted once the cached text exceeds max_bytes. A payload is a
+    string, or a list of strings for replies split over several pages.
+    """
+
+    def __init__(self, max_bytes, name="rendered"):
+        self.max_bytes = max_bytes
+        self.name = name
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (version, payload, size)
+        self.size = 0
+
+    def get(self, key, version):
+        """Returns the payload cached for key at version, or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            hit = version is not None and entry is not None and entry[0] == version
+            if hit:
+                self.entries.move_to_end(key)
+        metrics.cache_requests.labels(self.name, "hit" if hit else "miss").inc()
+        return entry[1] if hit else None
+
+    def put(self, key, version, payload):
+        if version is None:
+            return  # The data behind it is already stale
+        parts = [payload] if isinstance(payload, str) else payload
+        size = sum(len(part.encode("utf-8")) for part in parts)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old:
+                self.size -= old[2]
+            self.entries[key] = (version, payload, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, _, evicted) = self.entries.popitem(last=False)
+                self.size -= evicted
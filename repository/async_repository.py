@@ -0,0 +1,37 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RepositoryBusy(Exception):
+    """Raised when every worker and queue slot of an AsyncRepository is taken."""
+
+
+class RepositoryTimeout(Exception):
+    """Raised when a repository call takes longer than the per-request timeout."""
+
+
+class AsyncRepository:
+    """Runs blocking repository methods on a bounded thread pool so the event loop stays free."""
+
+    def __init__(self, repository, max_workers, max_pending, timeout):
+        self.repository = repository
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sheets")
+        # Calls running plus calls queued for a worker; anything beyond is rejected straight away
+        self.slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self.timeout = timeout
+
+    async def call(self, method, *args, **kwargs):
+        if not self.slots.acquire(blocking=False):
+            raise RepositoryBusy(f"Too many concurrent {method} calls")
+        try:
+            future = self.executor.submit(getattr(self.repository, method), *args, **kwargs)
+        except Exception:
+            self.slots.release()
+            raise
+        # The slot is freed when the work finishes, even if the caller stopped waiting
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise RepositoryTimeout(f"{method} did not finish within {self.timeout} seconds")
@@ -0,0 +1,49 @@
+import threading
+
+
+class AttendanceBuffer:
+    """Holds attendance marks in memory and writes them to the sheet in batches."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.pending = {}  # (row, col) -> mark waiting to be written
+        self.marked = {}  # col -> rows marked during that session
+
+    def mark(self, row, col, value):
+        """Records a mark, returning False if the row is already marked for this column."""
+        with self.lock:
+            rows = self.marked.setdefault(col, set())
+            if row in rows:
+                return False
+            rows.add(row)
+            self.pending[(row, col)] = value
+            return True
+
+    def pending_cells(self):
+        with self.lock:
+            return dict(self.pending)
+
+    def forget(self, col):
+        """Drops the dedupe set of a finished session. Pending marks are still flushed."""
+        with self.lock:
+            self.marked.pop(col, None)
+
+    def flush(self, write):
+        """Passes all pending marks to write as (row, col, value) cells in one call and returns how many were written.
+
+        If the write fails the marks are put back so the next flush retries them.
+        """
+        with self.flush_lock:
+            with self.lock:
+                pending, self.pending = self.pending, {}
+            if not pending:
+                return 0
+            try:
+                write([(row, col, value) for (row, col), value in pending.items()])
+            except Exception:
+                with self.lock:
+                    for cell, value in pending.items():
+                        self.pending.setdefault(cell, value)
+                raise
+            return len(pending)
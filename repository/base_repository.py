@@ -1,6 +1,21 @@
 from config import Config
+from datetime import datetime
 import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from google.oauth2.service_account import Credentials
+from metrics import tracked
+from repository.cache import TTLCache
+from repository.column_index import ColumnIndex
+from repository.lazy import lazy, spreadsheet
+from repository.sheets_client import QuotaAwareHTTPClient
+from repository.sheets_session import SheetsSession
+from repository.spreadsheets import SpreadsheetCache
+
+def open_session(credentials):
+    """Returns the HTTP session every Sheets request goes through, with its token refresher running."""
+    session = SheetsSession(credentials, Config.sheets_pool_size, Config.sheets_keepalive, Config.sheets_token_refresh_margin)
+    session.start()
+    return session
+
 
 class BaseRepository:
     scope = [
@@ -8,39 +23,56 @@ class BaseRepository:
         "https://www.googleapis.com/auth/spreadsheets",
         "https://www.googleapis.com/auth/drive"
     ]
-    creds = ServiceAccountCredentials.from_json_keyfile_name(Config.gsheet_creds_file_path, scope)
-    client = gspread.authorize(creds)
+    spreadsheet_name = Config.gsheet_name
+    # Nothing below talks to Google until it is first used
+    creds = lazy(lambda owner: Credentials.from_service_account_file(Config.gsheet_creds_file_path, scopes=owner.scope), shared=True)
+    session = lazy(lambda owner: open_session(owner.creds), shared=True)
+    client = lazy(lambda owner: gspread.Client(None, session=owner.session, http_client=QuotaAwareHTTPClient), shared=True)
+    # One handle cache for every cohort, so a spreadsheet is opened once however many repositories use it
+    spreadsheets = lazy(lambda owner: SpreadsheetCache(owner.client, Config.max_open_spreadsheets), shared=True)
+    gsheet = spreadsheet()
 
-    def __init__(self):
-        self.gsheet = self.client.open(Config.gsheet_name)
+    def __init__(self, spreadsheet_name=None):
+        if spreadsheet_name:
+            self.spreadsheet_name = spreadsheet_name
+        # Reloaded as often as the column index, so added or moved columns are picked up
+        self.headers = TTLCache(Config.column_index_ttl, "headers")
+        self.column_index = ColumnIndex(self, Config.column_index_ttl)
 
+    @tracked
     def exists_in_google_sheet(self, column, value, sheet="Sheet1"):
-        worksheet = self.gsheet.worksheet(sheet)
-        all_rows = worksheet.get_all_values()
-        if not all_rows:
-            return False
-        header = all_rows[0]
-        try:
-            col_index = header.index(column)
-        except ValueError:
-            return False
-        if col_index is None:
-            return False
-
-        for row in all_rows[1:]:
-            if len(row) > col_index and row[col_index] == value:
-                return True
-        return False
+        return self.column_index.contains(sheet or "Sheet1", column, value)
+
+    def exists_many(self, checks, sheet="Sheet1"):
+        """Checks several (column, value) pairs against one worksheet."""
+        return [self.exists_in_google_sheet(column, value, sheet) for column, value in checks]
+
+    def get_worksheet(self, sheet="Sheet1"):
+        """Returns a worksheet handle from the shared spreadsheet cache."""
+        return self.spreadsheets.worksheet(self.spreadsheet_name, sheet)
+
+    def get_header(self, sheet="Sheet1"):
+        """Returns the header row of a worksheet, read again once column_index_ttl has passed."""
+        return self.headers.get(sheet, lambda: self.get_worksheet(sheet).row_values(1))
+
+    def forget_sheets(self):
+        """Drops the cached header rows and column values, so the next use reads them from the sheets."""
+        self.headers.invalidate()
+        self.column_index.invalidate()
+
+    @staticmethod
+    def build_row(header, data):
+        return [data.get(col, '') for col in header]
+
+    @staticmethod
+    def stamp(data):
+        """Returns a copy of data with created_at set to the server time."""
+        return dict(data, created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
+    @tracked
     def append_to_google_sheet(self, data, sheet="Sheet1"):
-        worksheet = self.gsheet.worksheet(sheet)
-        header = worksheet.get_all_values()[0]
-        row = []
-        for col in header:
-            if col == 'created_at':
-                from datetime import datetime
-                row.append(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-            else:
-                row.append(data.get(col, ''))
-        worksheet.append_row(row)
+        worksheet = self.get_worksheet(sheet)
+        data = self.stamp(data)
+        worksheet.append_row(self.build_row(self.get_header(sheet), data))
+        self.column_index.add_row(sheet, data)
         return True
\ No newline at end of file
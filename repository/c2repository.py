@@ -1,12 +1,23 @@
 from config import Config
 from repository.base_repository import BaseRepository
+from repository.registration_queue import RegistrationQueue
 
 
 class C2Repository(BaseRepository):
 
-    def __init__(self):
-        super().__init__()
-        self.gsheet = self.client.open(Config.cohort2sheet)
+    def __init__(self, spreadsheet_name=None, journal_path=None):
+        super().__init__(spreadsheet_name or Config.cohort2sheet)
+        self.registrations = RegistrationQueue(
+            self, "registration", journal_path or Config.registration_journal_path,
+            Config.registration_batch_size, Config.registration_flush_interval
+        )
 
     def register_participant(self, participant_data):
-        return self.append_to_google_sheet(participant_data, sheet="registration")
\ No newline at end of file
+        """Queues a registration and returns a Future that resolves once it is in the sheet."""
+        return self.registrations.submit(participant_data)
+
+    def warm_up_steps(self):
+        return [
+            ("cohort2_spreadsheet", lambda: self.gsheet),
+            ("registration_header", lambda: self.get_header("registration")),
+        ]
\ No newline at end of file
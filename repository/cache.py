@@ -0,0 +1,99 @@
+import threading
+import time
+from concurrent.futures import Future
+
+import metrics
+
+
+class TTLCache:
+    """Read-through cache whose entries expire after ttl seconds.
+
+    Concurrent misses for the same key wait on a single load instead of each fetching.
+    """
+
+    def __init__(self, ttl, name="cache"):
+        self.ttl = ttl
+        self.name = name
+        self.lock = threading.Lock()
+        self.entries = {}  # key -> (loaded_at, value)
+        self.key_locks = {}
+        self.generation = 0
+
+    def get(self, key, loader):
+        value = self._fresh(key)
+        if value is not None:
+            metrics.cache_requests.labels(self.name, "hit").inc()
+            return value[0]
+        with self._key_lock(key):
+            value = self._fresh(key)  # Another thread may have loaded it while we waited
+            if value is not None:
+                metrics.cache_requests.labels(self.name, "hit").inc()
+                return value[0]
+            metrics.cache_requests.labels(self.name, "miss").inc()
+            generation = self.generation
+            loaded = loader()
+            with self.lock:
+                if generation == self.generation:  # Don't keep data loaded before an invalidate
+                    self.entries[key] = (time.monotonic(), loaded)
+            return loaded
+
+    def put(self, key, value):
+        """Stores value for key as if it had just been loaded."""
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+
+    def stamp(self, key):
+        """Returns when the entry for key was loaded, or None if it is missing or expired."""
+        entry = self.entries.get(key)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            return entry[0]
+        return None
+
+    def peek(self, key):
+        """Returns the cached value for key, fresh or not, without loading it."""
+        entry = self.entries.get(key)
+        return entry[1] if entry else None
+
+    def invalidate(self, key=None):
+        """Drops one entry, or every entry when no key is given."""
+        with self.lock:
+            self.generation += 1
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    def _fresh(self, key):
+        entry = self.entries.get(key)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            return (entry[1],)
+        return None
+
+    def _key_lock(self, key):
+        with self.lock:
+            return self.key_locks.setdefault(key, threading.Lock())
+
+
+class SingleFlight:
+    """Runs one call per key at a time; callers that arrive while it runs share its result."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}  # key -> Future of the call in flight
+
+    def do(self, key, fn):
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self.lock:
+                del self.calls[key]
+        return future.result()
@@ -0,0 +1,145 @@
+import threading
+
+from repository.c2repository import C2Repository
+from repository.repository import Repository
+
+
+class UnknownCohort(KeyError):
+    """Raised for a cohort ID that is not in the registry."""
+
+
+class CohortRegistry:
+    """Repositories of every cohort, keyed by cohort ID and created on first use.
+
+    Every repository shares BaseRepository's client and spreadsheet cache, so a cohort costs
+    nothing until it is used and a spreadsheet is opened once however many repositories use it.
+    The cohort whose spreadsheet is gsheet_name is served by Repository itself.
+    """
+
+    def __init__(self, cohorts, chats, default_cohort, registration_cohort, registration_journal_path):
+        self.cohorts = dict(cohorts)  # cohort ID -> spreadsheet name
+        self.chats = {str(chat_id): cohort for chat_id, cohort in chats.items()}
+        self.default_cohort = default_cohort
+        # Cohorts the bot serves; the rest only take registrations and have no participants sheet
+        self.bot_cohorts = list(dict.fromkeys([default_cohort, *self.chats.values()]))
+        self.joined = {}  # user ID -> cohort of the group they last joined
+        self.registration_cohort = registration_cohort
+        self.registration_journal_path = registration_journal_path
+        self.lock = threading.Lock()
+        self.bot_repositories = {}
+        self.registration_repositories = {}
+
+    def spreadsheet_name(self, cohort):
+        try:
+            return self.cohorts[cohort]
+        except KeyError:
+            raise UnknownCohort(cohort) from None
+
+    def repository(self, cohort=None):
+        """Returns the bot repository of a cohort, the default cohort if none is given."""
+        cohort = cohort or self.default_cohort
+        if cohort not in self.bot_repositories:
+            name = self.spreadsheet_name(cohort)
+            with self.lock:
+                if cohort not in self.bot_repositories:
+                    if name == Repository.spreadsheet_name:
+                        self.bot_repositories[cohort] = Repository
+                    else:
+                        self.bot_repositories[cohort] = Repository.for_spreadsheet(name, cohort)
+        return self.bot_repositories[cohort]
+
+    def repositories(self):
+        """Returns the bot repositories created so far."""
+        return list(self.bot_repositories.values())
+
+    def bot_repositories_all(self):
+        """Returns the bot repository of every cohort the bot serves, creating them if needed."""
+        return [self.repository(cohort) for cohort in self.bot_cohorts]
+
+    def remember_join(self, user_id, chat_id):
+        """Records the cohort of a group a user joined, for routing their private chat until they are linked."""
+        cohort = self.chats.get(str(chat_id))
+        if cohort is not None:
+            self.joined[user_id] = cohort
+
+    def for_chat(self, chat_id):
+        """Returns the bot repository a Telegram chat belongs to.
+
+        Groups are looked up in cohort_chats. A private chat has the user's ID, so it goes to the
+        cohort where that user is linked, else the cohort of the group they last joined.
+        """
+        cohort = self.chats.get(str(chat_id))
+        if cohort is not None:
+            return self.repository(cohort)
+        if self._is_private(chat_id):
+            for repository in self.bot_repositories_all():
+                if repository.participants().find_row("telegram_id", chat_id):
+                    return repository
+            if chat_id in self.joined:
+                return self.repository(self.joined[chat_id])
+        return self.repository()
+
+    def for_payment_reference(self, chat_id, payment_reference):
+        """Returns the repository to validate a payment reference against.
+
+        In a private chat the user may not be linked to any cohort yet, so every cohort is tried,
+        starting with the one the chat routes to.
+        """
+        return self._first_with(chat_id, lambda participants: participants.find_row("payment_reference", payment_reference))
+
+    def for_name(self, chat_id, telegram_name):
+        """Returns the repository to link a Telegram name in, trying every cohort in a private chat."""
+        return self._first_with(chat_id, lambda participants: participants.name_index().find(telegram_name))
+
+    def _first_with(self, chat_id, found):
+        repository = self.for_chat(chat_id)
+        if not self._is_private(chat_id) or found(repository.participants()):
+            return repository
+        for candidate in self.bot_repositories_all():
+            if candidate is not repository and found(candidate.participants()):
+                return candidate
+        return repository
+
+    def _is_private(self, chat_id):
+        # Group and channel IDs are negative; a single cohort needs no search
+        return chat_id > 0 and str(chat_id) not in self.chats and len(self.bot_cohorts) > 1
+
+    def registrations(self, cohort=None):
+        """Returns the registration repository of a cohort, the registration cohort if none is given."""
+        cohort = cohort or self.registration_cohort
+        if cohort not in self.registration_repositories:
+            name = self.spreadsheet_name(cohort)
+            with self.lock:
+                if cohort not in self.registration_repositories:
+                    journal_path = self.registration_journal_path
+                    if cohort != self.registration_cohort:
+                        journal_path = f"{journal_path}.{cohort}"  # Each queue replays only its own journal
+                    self.registration_repositories[cohort] = C2Repository(name, journal_path)
+        return self.registration_repositories[cohort]
+
+    def forget_registration_sheets(self):
+        """Drops the cached headers and column values of every registration repository created so far."""
+        for repository in list(self.registration_repositories.values()):
+            repository.forget_sheets()
+
+    def register_participant(self, participant_data, cohort=None):
+        return self.registrations(cohort).register_participant(participant_data)
+
+    def exists_in_google_sheet(self, column, value, sheet=None, cohort=None):
+        return self.registrations(cohort).exists_in_google_sheet(column, value, sheet)
+
+    def exists_many(self, checks, sheet=None, cohort=None):
+        return self.registrations(cohort).exists_many(checks, sheet)
+
+    def load_snapshots(self):
+        """Loads the disk snapshot of every bot cohort."""
+        for repository in self.bot_repositories_all():
+            repository.load_snapshot()
+
+    def warm_up_steps(self):
+        """Warms every bot cohort and the registration cohort; other registration cohorts open on first use."""
+        steps = []
+        for cohort in self.bot_cohorts:
+            prefix = "" if cohort == self.default_cohort else f"{cohort}:"
+            steps += [(prefix + name, step) for name, step in self.repository(cohort).warm_up_steps()]
+        return steps + self.registrations().warm_up_steps()
@@ -0,0 +1,42 @@
+from repository.cache import TTLCache
+from repository.participant_index import normalize_email
+
+
+class ColumnIndex:
+    """Sets of the values in worksheet columns, keyed by (sheet, column) and reloaded after ttl seconds.
+
+    Values are kept normalized, stripped and lower-cased like emails everywhere else, so every lookup
+    and the registration queue's duplicate check agree on what counts as the same value.
+    """
+
+    normalize = staticmethod(normalize_email)
+
+    def __init__(self, repository, ttl):
+        self.repository = repository
+        self.cache = TTLCache(ttl, "column_index")
+
+    def values(self, sheet, column):
+        """Returns the normalized values of a column."""
+        return self.cache.get((sheet, column), lambda: self._load(sheet, column))
+
+    def contains(self, sheet, column, value):
+        return self.normalize(value) in self.values(sheet, column)
+
+    def _load(self, sheet, column):
+        header = self.repository.get_header(sheet)
+        if column not in header:
+            return set()
+        worksheet = self.repository.get_worksheet(sheet)
+        values = (self.normalize(value) for value in worksheet.col_values(header.index(column) + 1)[1:])
+        return {value for value in values if value}
+
+    def invalidate(self, sheet=None, column=None):
+        """Drops a column, or every column when none is given, so the next lookup reads it from the sheet."""
+        self.cache.invalidate((sheet, column) if sheet else None)
+
+    def add_row(self, sheet, data):
+        """Adds a newly written row to every loaded column of its sheet."""
+        for column, value in data.items():
+            values = self.cache.peek((sheet, column))
+            if values is not None:
+                values.add(self.normalize(value))
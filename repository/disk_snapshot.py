@@ -0,0 +1,46 @@
+import gzip
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+
+def write_snapshot(path, sheets, spreadsheet):
+    """Writes {sheet: values} to a gzip'd JSON lines file, replacing path atomically.
+
+    The first line stamps the format version, the spreadsheet and the save time; each
+    following line holds one sheet.
+    """
+    temp_path = f"{path}.tmp"
+    with gzip.open(temp_path, "wt", encoding="utf-8") as snapshot_file:
+        header = {"version": FORMAT_VERSION, "spreadsheet": spreadsheet, "saved_at": time.time()}
+        snapshot_file.write(json.dumps(header) + "\n")
+        for sheet, values in sheets.items():
+            snapshot_file.write(json.dumps({"sheet": sheet, "values": values}, separators=(",", ":")) + "\n")
+    os.replace(temp_path, path)
+
+
+def read_snapshot(path, max_age, spreadsheet):
+    """Returns {sheet: values} from a snapshot file, or None if it is missing, unreadable,
+    older than max_age seconds or taken from another spreadsheet."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as snapshot_file:
+            header = json.loads(snapshot_file.readline())
+            if header.get("version") != FORMAT_VERSION or header.get("spreadsheet") != spreadsheet:
+                return None
+            if time.time() - header.get("saved_at", 0) > max_age:
+                return None
+            sheets = {}
+            for line in snapshot_file:
+                entry = json.loads(line)
+                sheets[entry["sheet"]] = entry["values"]
+            return sheets
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, EOFError) as e:
+        logger.warning("Ignoring unreadable snapshot %s: %s", path, e)
+        return None
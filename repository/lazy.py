@@ -0,0 +1,54 @@
+import threading
+
+
+class lazy:
+    """Attribute that is opened on first access and then cached.
+
+    Works on classes and instances alike. Each class (or instance) gets its own value unless
+    shared is set, in which case every class in the hierarchy shares one.
+    """
+
+    def __init__(self, opener, shared=False):
+        self.opener = opener
+        self.shared = shared
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is not None and not self.shared:
+            with self.lock:
+                if self.name not in instance.__dict__:
+                    # Stored on the instance, so later lookups never reach the descriptor
+                    instance.__dict__[self.name] = self.opener(instance)
+            return instance.__dict__[self.name]
+        key = None if self.shared else owner
+        if key not in self.values:
+            with self.lock:
+                if key not in self.values:
+                    self.values[key] = self.opener(owner)
+        return self.values[key]
+
+
+class spreadsheet:
+    """The owner's spreadsheet, looked up in its spreadsheet cache on every access.
+
+    Nothing is kept on the owner, so a handle dropped from the cache is reopened on next use.
+    """
+
+    def __get__(self, instance, owner):
+        holder = owner if instance is None else instance
+        return holder.spreadsheets.spreadsheet(holder.spreadsheet_name)
+
+
+class worksheet(spreadsheet):
+    """A worksheet of the owner's spreadsheet, looked up in its spreadsheet cache on every access."""
+
+    def __init__(self, title):
+        self.title = title
+
+    def __get__(self, instance, owner):
+        holder = owner if instance is None else instance
+        return holder.spreadsheets.worksheet(holder.spreadsheet_name, self.title)
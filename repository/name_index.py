@@ -0,0 +1,70 @@
+from collections import Counter
+from itertools import chain
+
+
+class NameIndex:
+    """Exact and fuzzy lookups over participant full names.
+
+    Exact matching follows the original rules: the Telegram name's tokens must equal the
+    participant's first two names, their first and third names, or all of their names.
+    Fuzzy matching ranks participants by trigram similarity.
+    """
+
+    def __init__(self, names):
+        self.exact = {}  # frozenset of name tokens -> first matching row
+        self.trigrams = {}  # trigram -> list of rows containing it
+        self.trigram_counts = {}  # row -> number of distinct trigrams in the name
+        for row, name in names:
+            tokens = self.tokens(name)
+            if not tokens:
+                continue
+            for key in self._exact_keys(tokens):
+                self.exact.setdefault(key, row)
+            grams = self._trigrams(tokens)
+            self.trigram_counts[row] = len(grams)
+            for gram in grams:
+                self.trigrams.setdefault(gram, []).append(row)
+
+    @staticmethod
+    def tokens(name):
+        return str(name).strip().lower().split()
+
+    @staticmethod
+    def _exact_keys(names):
+        keys = [frozenset(names[:2])]
+        if len(names) > 2:
+            keys.append(frozenset({names[0], names[2]}))
+            keys.append(frozenset(names))
+        return keys
+
+    @staticmethod
+    def _trigrams(tokens):
+        grams = set()
+        for token in tokens:
+            padded = f"  {token} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return grams
+
+    def find(self, telegram_name):
+        """Returns the first row matching a Telegram name exactly, or None."""
+        name_parts = self.tokens(telegram_name)
+        if not name_parts:
+            return None
+        # Telegram splits names into first and last, so everything after the first word is one token
+        tg_first_name = name_parts[0]
+        tg_last_name = "".join(name_parts[1:])
+        full_name_parts = {tg_first_name, tg_last_name} if tg_last_name else {tg_first_name}
+        return self.exact.get(frozenset(full_name_parts))
+
+    def search(self, name, limit=5):
+        """Returns up to limit (row, similarity) pairs, best first, with similarity in [0, 1]."""
+        grams = self._trigrams(self.tokens(name))
+        if not grams:
+            return []
+        shared = Counter(chain.from_iterable(self.trigrams.get(gram, ()) for gram in grams))
+        scored = [
+            (row, count / (len(grams) + self.trigram_counts[row] - count))
+            for row, count in shared.items()
+        ]
+        scored.sort(key=lambda match: (-match[1], match[0]))
+        return scored[:limit]
@@ -0,0 +1,188 @@
+"""Imports participants from a CSV file into the participants sheet.
+
+    python -m repository.participant_import [path/to/participants.csv] [--chunk-size 500]
+
+Rows are upserted by email, matched case-insensitively: known emails have their changed cells
+updated, new emails are appended. Rows sharing an email are merged first, so every email is one
+update or one append. Participants are written in chunks, each with at most one batch update and
+one append, so an import takes about two Sheets calls per chunk_size participants. Progress is
+checkpointed after every chunk; running the same import again resumes where it stopped.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+from config import Config
+from repository.participant_index import normalize_email
+
+# CSV headers that name a participants sheet column differently
+ALIASES = {
+    "email": "Email address",
+    "email address": "Email address",
+    "name": "Full Name",
+    "full name": "Full Name",
+    "payment reference": "Payment Reference",
+    "reference": "Payment Reference",
+}
+NAME_COLUMNS = ("Full Name",)
+
+
+def normalize_name(value):
+    """Collapses whitespace, and capitalizes names typed in all lower or all upper case."""
+    name = " ".join((value or "").split())
+    if name and (name.islower() or name.isupper()):
+        name = " ".join(part.capitalize() for part in name.split(" "))
+    return name
+
+
+class ParticipantImporter:
+    def __init__(self, repository, chunk_size=500, checkpoint_path=None):
+        self.repository = repository
+        self.chunk_size = chunk_size
+        self.checkpoint_path = checkpoint_path
+
+    def run(self, path):
+        """Imports path and returns counts of the rows read, participants updated and added, and rows skipped."""
+        checkpoint_path = self.checkpoint_path or f"{path}.checkpoint"
+        source = self._source(path)
+        done = self._resume(checkpoint_path, source)
+
+        # Start from the sheet as it is now; rows appended before an interruption become updates
+        participants = self.repository.refresh_participants()
+        headers = participants.headers
+        if "Email address" not in headers:
+            raise ValueError("Email address column not found in participants sheet.")
+        emails = {}
+        for row_number, email in participants.column_values("Email address"):
+            emails.setdefault(normalize_email(email), row_number)
+
+        with open(path, newline="", encoding="utf-8-sig") as csv_file:
+            reader = csv.DictReader(csv_file)
+            imported, stats = self._merge(reader, self._columns(reader.fieldnames or [], headers))
+        stats.update(updated=0, added=0, resumed_at=done)
+
+        for start in range(done, len(imported), self.chunk_size):
+            chunk = imported[start:start + self.chunk_size]
+            cells, appends = [], []
+            for values in chunk:
+                row_number = emails.get(values["Email address"])
+                if row_number is None:
+                    # Sheets decides where appended rows land, so they are never addressed by row here
+                    row = [""] * len(headers)
+                    for header, value in values.items():
+                        row[headers.index(header)] = value
+                    appends.append(row)
+                    stats["added"] += 1
+                    continue
+                changed = False
+                for header, value in values.items():
+                    col = headers.index(header) + 1
+                    existing = participants.value(row_number, col)
+                    # The sheet keeps its own spelling of a known email
+                    if header == "Email address" and normalize_email(existing) == value:
+                        continue
+                    if existing != value:
+                        cells.append((row_number, col, value))
+                        changed = True
+                if changed:
+                    stats["updated"] += 1
+            if cells:
+                self.repository.storage.update_cells("participants", cells)
+                for row_number, col, value in cells:
+                    participants.set_value(row_number, col, value)
+            if appends:
+                self.repository.storage.append_rows("participants", appends)
+            self._save(checkpoint_path, source, start + len(chunk))
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        self.repository.refresh_participants()
+        return stats
+
+    @classmethod
+    def _merge(cls, reader, columns):
+        """Merges the CSV rows by email, later non-blank cells winning, in order of first appearance.
+
+        Returns the participants' values and the counts of rows read and skipped without an email.
+        """
+        merged = {}
+        stats = {"rows": 0, "skipped": 0}
+        for record in reader:
+            stats["rows"] += 1
+            values = cls._values(record, columns)
+            email = values.get("Email address")
+            if not email:
+                stats["skipped"] += 1
+                continue
+            # Blank CSV cells never clear the sheet
+            merged.setdefault(email, {}).update((header, value) for header, value in values.items() if value)
+        return list(merged.values()), stats
+
+    @staticmethod
+    def _columns(fieldnames, headers):
+        """Maps CSV headers onto participants sheet headers, ignoring the ones with no column."""
+        by_name = {header.strip().lower(): header for header in headers if header}
+        columns = {}
+        for field in fieldnames:
+            key = (field or "").strip().lower()
+            header = ALIASES.get(key, by_name.get(key))
+            if header in headers and header not in columns.values():
+                columns[field] = header
+        return columns
+
+    @staticmethod
+    def _values(record, columns):
+        values = {}
+        for field, header in columns.items():
+            value = (record.get(field) or "").strip()
+            if header == "Email address":
+                value = normalize_email(value)
+            elif header in NAME_COLUMNS:
+                value = normalize_name(value)
+            values[header] = value
+        return values
+
+    @staticmethod
+    def _source(path):
+        """Identifies the file, so a checkpoint is never applied to a different one."""
+        stat = os.stat(path)
+        return {"path": os.path.abspath(path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+    @staticmethod
+    def _resume(checkpoint_path, source):
+        try:
+            with open(checkpoint_path) as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+        except (OSError, ValueError):
+            return 0
+        return checkpoint.get("participants", 0) if checkpoint.get("source") == source else 0
+
+    @staticmethod
+    def _save(checkpoint_path, source, participants):
+        temp_path = f"{checkpoint_path}.tmp"
+        with open(temp_path, "w") as checkpoint_file:
+            json.dump({"source": source, "participants": participants}, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temp_path, checkpoint_path)
+
+
+def main(argv=None):
+    from repository.repository import Repository
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default=Config.participant_csv_path)
+    parser.add_argument("--chunk-size", type=int, default=Config.import_chunk_size)
+    args = parser.parse_args(argv)
+    if not args.path:
+        parser.error("no CSV path given and participant_csv_path is not set")
+    stats = Repository.import_participants(args.path, args.chunk_size)
+    print(json.dumps(stats))
+    Repository.storage.refresh()  # Push writes still queued in a local mirror before exiting
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+import itertools
+import threading
+
+from repository.name_index import NameIndex
+
+
+def normalize_email(value):
+    """The form emails are compared in everywhere: the participant index, score lookups and imports."""
+    return str(value or "").strip().lower()
+
+
+class ParticipantIndex:
+    """In-memory snapshot of the participants sheet, keyed by Telegram ID, email and payment reference."""
+
+    key_columns = {
+        "telegram_id": "Telegram ID",
+        "email": "Email address",
+        "payment_reference": "Payment Reference",
+    }
+    versions = itertools.count(1)
+
+    def __init__(self, values):
+        self.lock = threading.RLock()
+        self.version = next(self.versions)  # Tells one load of the sheet from the next
+        headers = list(values[0]) if values else []
+        while headers and not str(headers[-1]).strip():
+            headers.pop()  # get_all_values pads the header row to the widest data row
+        self.headers = headers
+        self.rows = {}  # sheet row number -> list of cell values
+        self.keys = {key: {} for key in self.key_columns}
+        self._names = None
+        for row_number, row in enumerate(values[1:], start=2):
+            self.rows[row_number] = list(row)
+            for key in self.key_columns:
+                self._add_key(key, row_number)
+
+    @staticmethod
+    def _normalize(value, key=None):
+        if key == "email":
+            return normalize_email(value)
+        return str(value).strip() if value is not None else ""
+
+    def column(self, header):
+        """Returns the 1-based column index of a header, raising ValueError if it is missing."""
+        return self.headers.index(header) + 1
+
+    def value(self, row_number, col_index):
+        row = self.rows.get(row_number, [])
+        return row[col_index - 1] if col_index <= len(row) else ""
+
+    def record(self, row_number):
+        """Returns a row as a dictionary keyed by the column headers."""
+        return dict(zip(self.headers, self.rows.get(row_number, [])))
+
+    def find_row(self, key, value):
+        """Returns the row number holding value in the given key column, or None."""
+        value = self._normalize(value, key)
+        if not value:
+            return None
+        return self.keys[key].get(value)
+
+    def column_values(self, header):
+        """Returns (row number, value) pairs for every participant in a column."""
+        try:
+            col_index = self.column(header)
+        except ValueError:
+            return []
+        return [(row_number, self.value(row_number, col_index)) for row_number in sorted(self.rows)]
+
+    def values(self):
+        """Returns the snapshot as sheet values, header row first."""
+        with self.lock:
+            last_row = max(self.rows, default=1)
+            return [list(self.headers)] + [list(self.rows.get(row_number, [])) for row_number in range(2, last_row + 1)]
+
+    def name_index(self):
+        """Returns the name index for this snapshot, building it on first use."""
+        if self._names is None:
+            with self.lock:
+                if self._names is None:
+                    self._names = NameIndex(self.column_values("Full Name"))
+        return self._names
+
+    def set_value(self, row_number, col_index, value):
+        """Applies a cell write that has already been sent to the sheet."""
+        with self.lock:
+            row = self.rows.setdefault(row_number, [])
+            if len(row) < col_index:
+                row.extend([""] * (col_index - len(row)))
+            header = self.headers[col_index - 1] if col_index <= len(self.headers) else None
+            keys = [key for key, column in self.key_columns.items() if column == header]
+            for key in keys:
+                self._remove_key(key, row_number)
+            row[col_index - 1] = value
+            for key in keys:
+                self._add_key(key, row_number)
+
+    def set_header(self, col_index, header):
+        with self.lock:
+            if len(self.headers) < col_index:
+                self.headers.extend([""] * (col_index - len(self.headers)))
+            self.headers[col_index - 1] = header
+
+    def _add_key(self, key, row_number):
+        try:
+            col_index = self.column(self.key_columns[key])
+        except ValueError:
+            return
+        value = self._normalize(self.value(row_number, col_index), key)
+        if value:
+            self.keys[key].setdefault(value, row_number)  # first match wins, like Worksheet.find
+
+    def _remove_key(self, key, row_number):
+        try:
+            col_index = self.column(self.key_columns[key])
+        except ValueError:
+            return
+        value = self._normalize(self.value(row_number, col_index), key)
+        if self.keys[key].get(value) == row_number:
+            del self.keys[key][value]
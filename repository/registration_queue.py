@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import Future
+
+from metrics import tracked
+
+
+class RegistrationQueue:
+    """Queues registrations and appends them to a worksheet in batches.
+
+    Every registration is written to a local journal before it is acknowledged. Rows leave the
+    journal only after append_rows succeeds, and the journal is replayed when the queue starts.
+    Duplicates are checked against the key column as the column index last read it, reloaded after
+    its TTL, and against the registrations still queued, with the column index's normalization.
+    """
+
+    def __init__(self, repository, sheet, journal_path, batch_size, flush_interval, key_column="email"):
+        self.repository = repository
+        self.sheet = sheet
+        self.journal_path = journal_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.key_column = key_column
+        self.logger = logging.getLogger(__name__)
+        self.cond = threading.Condition()
+        self.queue = []  # (registration id, row data, future), oldest first
+        self.pending = set()  # keys of the registrations queued
+        self.unconfirmed = 0  # entries at the front of the queue that may already be in the sheet
+        self.thread = None
+        self._replay()
+
+    def _key(self, value):
+        return self.repository.column_index.normalize(value)
+
+    def submit(self, data):
+        """Journals a registration and returns a Future that resolves once its row is appended.
+
+        The Future resolves to False straight away if the key column value is already registered.
+        """
+        data = self.repository.stamp(data)  # Time of receipt, not of the batched append
+        key = self._key(data.get(self.key_column))
+        future = Future()
+        # Read outside the lock, so a reload of the column never holds up the other registrations
+        values = self.repository.column_index.values(self.sheet, self.key_column) if key else None
+        with self.cond:
+            if key and (key in self.pending or key in values):
+                future.set_result(False)
+                return future
+            entry = (uuid.uuid4().hex, data, future)
+            self._journal([entry])
+            self.queue.append(entry)
+            if key:
+                self.pending.add(key)
+            # Queued rows count as registered for /check-exists too
+            self.repository.column_index.add_row(self.sheet, data)
+            if len(self.queue) == 1 or len(self.queue) >= self.batch_size:
+                self.cond.notify()  # Wake the appender if it is idle or the batch is full
+            self._start()
+        return future
+
+    def _start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name=f"{self.sheet}-appender", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            if self.unconfirmed:
+                try:
+                    self._drop_appended()
+                except Exception as e:
+                    self.logger.warning(f"Checking queued registrations against {self.sheet} failed, will retry: {e}")
+                    with self.cond:
+                        self.cond.wait(timeout=self.flush_interval)
+                    continue
+            with self.cond:
+                while not self.queue:
+                    self.cond.wait()
+                if len(self.queue) < self.batch_size:
+                    self.cond.wait(timeout=self.flush_interval)  # Give the batch time to fill up
+                batch = self.queue[:self.batch_size]
+            try:
+                self.append_registrations(batch)
+            except Exception as e:
+                self.logger.warning(f"Appending {len(batch)} registrations failed, will retry: {e}")
+                with self.cond:
+                    # The append may have reached the sheet before the error, so check before retrying
+                    self.unconfirmed = max(self.unconfirmed, len(batch))
+                    self.cond.wait(timeout=self.flush_interval)
+                continue
+            with self.cond:
+                del self.queue[:len(batch)]  # New entries only ever go to the end
+                self._rewrite_journal()
+                for _, data, _ in batch:
+                    self.pending.discard(self._key(data.get(self.key_column)))
+                    # Again, in case the column was reloaded from the sheet before the append
+                    self.repository.column_index.add_row(self.sheet, data)
+            for _, _, future in batch:
+                future.set_result(True)
+
+    def _drop_appended(self):
+        """Drops replayed or failed registrations whose rows are in the sheet already.
+
+        A crash between append_rows and the journal rewrite leaves appended rows in the journal, and an
+        append that failed on a 5xx or a dropped connection may have been applied all the same.
+        """
+        self.repository.column_index.invalidate(self.sheet, self.key_column)
+        values = self.repository.column_index.values(self.sheet, self.key_column)
+        with self.cond:
+            unconfirmed, rest = self.queue[:self.unconfirmed], self.queue[self.unconfirmed:]
+            appended = [entry for entry in unconfirmed if self._key(entry[1].get(self.key_column)) in values]
+            if appended:
+                appended_ids = {entry[0] for entry in appended}
+                self.queue = [entry for entry in unconfirmed if entry[0] not in appended_ids] + rest
+                self.pending.difference_update(self._key(entry[1].get(self.key_column)) for entry in appended)
+                self._rewrite_journal()
+                self.logger.info(f"Dropped {len(appended)} queued registrations already in {self.sheet}")
+            self.unconfirmed = 0
+        for _, _, future in appended:
+            future.set_result(True)
+
+    @tracked
+    def append_registrations(self, batch):
+        header = self.repository.get_header(self.sheet)
+        rows = [self.repository.build_row(header, data) for _, data, _ in batch]
+        self.repository.get_worksheet(self.sheet).append_rows(rows)
+
+    def _journal(self, entries):
+        with open(self.journal_path, "a", encoding="utf-8") as journal:
+            for registration_id, data, _ in entries:
+                journal.write(json.dumps({"id": registration_id, "data": data}) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    def _rewrite_journal(self):
+        temp_path = f"{self.journal_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as journal:
+            for registration_id, data, _ in self.queue:
+                journal.write(json.dumps({"id": registration_id, "data": data}) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(temp_path, self.journal_path)
+
+    def _replay(self):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, encoding="utf-8") as journal:
+            for line in journal:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    self.logger.warning(f"Skipping unreadable journal line: {line!r}")  # Torn write at a crash
+                    continue
+                self.queue.append((entry["id"], entry["data"], Future()))
+                key = self._key(entry["data"].get(self.key_column))
+                if key:
+                    self.pending.add(key)
+        self.unconfirmed = len(self.queue)
+        if self.queue:
+            self.logger.info(f"Replaying {len(self.queue)} journaled registrations for {self.sheet}")
+            self._start()
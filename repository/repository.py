@@ -1,33 +1,198 @@
-from gspread.utils import ValueInputOption
-
 from config import Config
 from datetime import datetime
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+import threading
 
+from metrics import tracked
+from repository.attendance_buffer import AttendanceBuffer
 from repository.base_repository import BaseRepository
+from repository.cache import TTLCache
+from repository.disk_snapshot import read_snapshot, write_snapshot
+from repository.lazy import lazy, worksheet
+from repository.participant_import import ParticipantImporter
+from repository.participant_index import ParticipantIndex, normalize_email
+from repository.score_snapshot import ScoreSnapshot
+from repository.storage import SheetsStorage, header_of, make_storage, records
 
 
 class Repository(BaseRepository):
-    gsheet = BaseRepository.client.open(Config.gsheet_name)
-    participants_sheet = gsheet.worksheet("participants")
-    assignments_sheet = gsheet.worksheet("assignments")
-    recordings_sheet = gsheet.worksheet("recordings")
-    resources_sheet = gsheet.worksheet("resources")
-    score_sheet = gsheet.worksheet("score_sheet")
-    score_rules_sheet = gsheet.worksheet("score_rules")
+    sheets = lazy(SheetsStorage)  # Direct spreadsheet access
+    storage = lazy(make_storage)  # What reads and writes go through, see Config.storage_backend
+    participants_sheet = worksheet("participants")
+    assignments_sheet = worksheet("assignments")
+    recordings_sheet = worksheet("recordings")
+    resources_sheet = worksheet("resources")
+    score_sheet = worksheet("score_sheet")
+    score_rules_sheet = worksheet("score_rules")
+
+    _participants = None
+    _participants_lock = threading.Lock()
+    _scores = None
+    _scores_lock = threading.Lock()
+    _columns_lock = threading.Lock()  # Sessions starting together must not claim the same column
+    attendance_buffer = AttendanceBuffer()
+    listings_cache = TTLCache(Config.listing_cache_ttl, "listings")
+    score_cache = TTLCache(Config.score_cache_ttl, "assignment_scores")
+    _sheet_values = {}  # Last values read of every sheet except participants, for the disk snapshot
+    _warm_started = False
+    _live = False  # Whether the participant index was read from the sheet rather than the disk snapshot
+    listings = ("assignments", "resources", "recordings")
+    cohort = None  # Set on the repositories made by for_spreadsheet
+
+    @classmethod
+    def for_spreadsheet(cls, spreadsheet_name, cohort=None):
+        """Returns a subclass bound to another spreadsheet, with its own indexes, caches and local files."""
+        return type(f"{cls.__name__}[{cohort or spreadsheet_name}]", (cls,), {
+            "spreadsheet_name": spreadsheet_name,
+            "cohort": cohort,
+            "_participants": None,
+            "_participants_lock": threading.Lock(),
+            "_scores": None,
+            "_scores_lock": threading.Lock(),
+            "_columns_lock": threading.Lock(),
+            "attendance_buffer": AttendanceBuffer(),
+            "listings_cache": TTLCache(Config.listing_cache_ttl, "listings"),
+            "score_cache": TTLCache(Config.score_cache_ttl, "assignment_scores"),
+            "_sheet_values": {},
+            "_warm_started": False,
+            "_live": False,
+        })
 
     @classmethod
+    def local_path(cls, path):
+        """Returns path with the cohort appended, so cohorts never share a mirror or snapshot file."""
+        return f"{path}.{cls.cohort}" if path and cls.cohort else path
+
+    @classmethod
+    @tracked
     def get_assignments(cls):
-        return cls.assignments_sheet.get_all_records()
+        return cls.listings_cache.get("assignments", lambda: cls._load_listing("assignments"))
 
     @classmethod
+    @tracked
     def get_resources(cls):
-        return cls.resources_sheet.get_all_records()
+        return cls.listings_cache.get("resources", lambda: cls._load_listing("resources"))
 
     @classmethod
+    @tracked
     def get_recordings(cls):
-        return cls.recordings_sheet.get_all_records()
+        return cls.listings_cache.get("recordings", lambda: cls._load_listing("recordings"))
+
+    @classmethod
+    def listing_version(cls, sheet):
+        """Returns a stamp that changes whenever a listing is reloaded, or None if it is missing or expired."""
+        return cls.listings_cache.stamp(sheet)
+
+    @classmethod
+    def _load_listing(cls, sheet):
+        values = cls.storage.get_values(sheet)
+        cls._sheet_values[sheet] = values
+        return records(values)
+
+    @classmethod
+    def warm_up_steps(cls):
+        """Returns the (name, callable) steps that open every handle and load the participant index.
+
+        After a warm start from the disk snapshot the steps reload everything from the sheets instead,
+        while requests keep being answered from the snapshot.
+        """
+        steps = [("spreadsheet", lambda: cls.gsheet)]
+        for name in ("participants_sheet", "assignments_sheet", "recordings_sheet",
+                     "resources_sheet", "score_sheet", "score_rules_sheet"):
+            steps.append((name, lambda name=name: getattr(cls, name)))
+        if cls._warm_started:
+            steps.append(("participant_index", cls.refresh_participants))
+            steps.append(("score_snapshot", cls.refresh_scores))
+            steps.append(("listings", cls.reload_listings))
+        else:
+            steps.append(("participant_index", cls.participants))
+            steps.append(("score_snapshot", cls.score_snapshot))
+        return steps
+
+    @classmethod
+    @tracked
+    def reload_listings(cls):
+        """Reloads the cached listings and assignment scores in place, without emptying the caches first."""
+        for sheet in cls.listings:
+            cls.listings_cache.put(sheet, cls._load_listing(sheet))
+        assignments = cls.listings_cache.peek("assignments") or []
+        sheets = cls._score_key(str(assignment.get('Sheet', '')).strip() for assignment in assignments)
+        if sheets:
+            cls.score_cache.put(sheets, cls._load_score_maps(sheets))
+
+    @classmethod
+    @tracked
+    def save_snapshot(cls, path=None):
+        """Writes the sheet values held in memory to the disk snapshot. Returns the number of sheets saved."""
+        path = path or cls.local_path(Config.snapshot_path)
+        if not path:
+            return 0
+        sheets = dict(cls._sheet_values)
+        if cls._participants is not None:
+            values = cls._participants.values()
+            # Unflushed marks are not in the sheet yet, so they must not come back after a restart as if they were
+            for row, col in cls.attendance_buffer.pending_cells():
+                if row <= len(values) and col <= len(values[row - 1]):
+                    values[row - 1][col - 1] = ""
+            sheets["participants"] = values
+        if not sheets:
+            return 0
+        write_snapshot(path, sheets, cls.spreadsheet_name)
+        return len(sheets)
+
+    @classmethod
+    def load_snapshot(cls, path=None):
+        """Fills the participant index, score snapshot and caches from the disk snapshot.
+
+        Returns False, leaving everything to load from the sheets, if there is no usable snapshot.
+        """
+        path = path or cls.local_path(Config.snapshot_path)
+        sheets = read_snapshot(path, Config.snapshot_max_age, cls.spreadsheet_name) if path else None
+        if not sheets:
+            return False
+        if "participants" in sheets:
+            with cls._participants_lock:
+                if cls._participants is None:
+                    cls._use_participants(sheets.pop("participants"), live=False)
+        if "score_sheet" in sheets and "score_rules" in sheets and cls._scores is None:
+            cls._scores = ScoreSnapshot(sheets["score_sheet"], sheets["score_rules"])
+        for sheet in cls.listings:
+            if sheet in sheets:
+                cls.listings_cache.put(sheet, records(sheets[sheet]))
+        assignments = records(sheets.get("assignments", []))
+        score_sheets = cls._score_key(str(assignment.get('Sheet', '')).strip() for assignment in assignments)
+        if score_sheets and all(sheet in sheets for sheet in score_sheets):
+            cls.score_cache.put(score_sheets, {sheet: cls._score_map(sheets[sheet]) for sheet in score_sheets})
+        cls._sheet_values.update(sheets)
+        cls._warm_started = True
+        return True
+
+    @classmethod
+    @tracked
+    def refresh(cls):
+        """Picks up sheet edits, drops cached sheet data and reloads the participant index and scores."""
+        cls.storage.refresh()
+        cls.listings_cache.invalidate()
+        cls.score_cache.invalidate()
+        cls.refresh_participants()
+        cls.refresh_scores()
+
+    @classmethod
+    def score_snapshot(cls):
+        """Returns the score snapshot, loading it with a single batched read on first use."""
+        if cls._scores is None:
+            with cls._scores_lock:
+                if cls._scores is None:
+                    cls.refresh_scores()
+        return cls._scores
+
+    @classmethod
+    @tracked
+    def refresh_scores(cls):
+        """Reloads the score snapshot from score_sheet and score_rules in one read."""
+        values = cls.storage.get_many(["score_sheet", "score_rules"])
+        cls._sheet_values.update(values)
+        cls._scores = ScoreSnapshot(values["score_sheet"], values["score_rules"])
+        return cls._scores
 
     @classmethod
     def get_overall_score(self, member_email):
@@ -36,22 +201,11 @@ class Repository(BaseRepository):
             if not member_email:
                 return None  # Email is required
 
-            headers = self.score_sheet.row_values(1)  # Fetch column headers
-
-            # Locate the 'Email address' column index
-            email_index = headers.index("Email address") + 1  # Google Sheets uses 1-based index
-
-            # Locate the row containing the member's email
-            cell = self.score_sheet.find(str(member_email), in_column=email_index)
-            if not cell:
+            snapshot = self.score_snapshot()
+            scores_dict = snapshot.scores(member_email)  # Maps headers to values
+            if not scores_dict:
                 return None  # Email not found
-
-            # Fetch all scores from that row
-            scores = self.score_sheet.row_values(cell.row)
-
-            # Create a dictionary mapping headers to values
-            scores_dict = {headers[i]: scores[i] if i < len(scores) else "N/A" for i in range(len(headers))}
-            total_score = self.score_rules_sheet.acell("D2").value
+            total_score = snapshot.total_score
 
             return {
                 "Full Name": scores_dict.get("Full Name", "N/A"),
@@ -75,40 +229,132 @@ class Repository(BaseRepository):
     @classmethod
     def get_score(cls, assignment_sheet, member_email):
         """Finds a user's score in the assignment sheet based on their email."""
+        return cls.get_scores([assignment_sheet], member_email).get(assignment_sheet, 0)
+
+    @classmethod
+    @tracked
+    def get_scores(cls, assignment_sheets, member_email):
+        """Finds a user's score in every assignment sheet, returning a {sheet: score} dictionary."""
         try:
-            if not assignment_sheet:
-                return 0
-            sheet = cls.gsheet.worksheet(assignment_sheet)
-            headers = sheet.row_values(1)
-            
-            # Find the column indexes for 'Email' and 'Score'
-            email_index = headers.index("Email address") + 1  # Convert to 1-based index
-            score_index = headers.index("Score") + 1  # Convert to 1-based index
-            
-            # Find the row where the Email is located
-            cell = sheet.find(str(member_email), in_column=email_index)
-            if not cell:
-                return 0  
-            # Fetch the score from the corresponding row
-            score = sheet.cell(cell.row, score_index).value
-            
-            return score if score else 0  
-        except ValueError:
-            return 0  # If the email is not found in the sheet
+            score_maps = cls.get_score_maps(assignment_sheets)
+            member_email = normalize_email(member_email)
+            return {
+                sheet: score_maps.get(sheet, {}).get(member_email) or 0
+                for sheet in assignment_sheets
+            }
         except Exception as e:
             raise RuntimeError(f"Error retrieving score: {e}")
 
+    @classmethod
+    def get_score_maps(cls, assignment_sheets):
+        """Returns an email -> score map per assignment sheet.
+
+        All sheets are fetched with a single values_batch_get request and cached together.
+        """
+        sheets = cls._score_key(assignment_sheets)
+        if not sheets:
+            return {}
+        return cls.score_cache.get(sheets, lambda: cls._load_score_maps(sheets))
+
+    @staticmethod
+    def _score_key(assignment_sheets):
+        return tuple(sorted({sheet for sheet in assignment_sheets if sheet}))
+
+    @classmethod
+    def assignments_version(cls):
+        """Returns a stamp of the data behind /assignments, or None if some of it is missing or expired.
+
+        The stamp changes whenever the assignments, their scores or the participant index are reloaded.
+        """
+        assignments = cls.listings_cache.peek("assignments")
+        listed = cls.listings_cache.stamp("assignments")
+        if assignments is None or listed is None:
+            return None
+        sheets = cls._score_key(str(assignment['Sheet']).strip() for assignment in assignments)
+        scored = cls.score_cache.stamp(sheets) if sheets else 0
+        if scored is None:
+            return None
+        return (listed, scored, cls.participants().version)
+
+    @classmethod
+    def scores_version(cls):
+        """Returns a stamp that changes whenever the score snapshot or the participant index is reloaded."""
+        return (cls.score_snapshot().version, cls.participants().version)
+
+    @classmethod
+    def _load_score_maps(cls, sheets):
+        values = cls.storage.get_many(sheets)
+        cls._sheet_values.update(values)
+        return {sheet: cls._score_map(sheet_values) for sheet, sheet_values in values.items()}
+
+    @staticmethod
+    def _score_map(values):
+        """Builds an email -> score map from the values of an assignment sheet."""
+        if not values:
+            return {}
+        headers = values[0]
+        try:
+            email_index = headers.index("Email address")
+            score_index = headers.index("Score")
+        except ValueError:
+            return {}
+        score_map = {}
+        for row in values[1:]:
+            if len(row) <= email_index:
+                continue
+            email = normalize_email(row[email_index])
+            if email and email not in score_map:  # First match wins, like Worksheet.find
+                score_map[email] = row[score_index] if len(row) > score_index else ""
+        return score_map
+
+
+    @classmethod
+    def participants(cls):
+        """Returns the participant index, loading it with a single bulk read on first use."""
+        if cls._participants is None:
+            with cls._participants_lock:
+                if cls._participants is None:
+                    cls.refresh_participants()
+        return cls._participants
+
+    @classmethod
+    @tracked
+    def refresh_participants(cls):
+        """Reloads the participant index from the participants sheet."""
+        return cls._use_participants(cls.storage.get_values("participants"))
+
+    @classmethod
+    def live_participants(cls):
+        """Returns the participant index as last read from the sheet, for writes addressed by row.
+
+        An index loaded from the disk snapshot only serves reads: its rows may have moved since it was
+        saved, so it is reloaded from the sheet before the first write.
+        """
+        if not cls._live:
+            with cls._participants_lock:
+                if not cls._live:
+                    cls.refresh_participants()
+        return cls._participants
+
+    @classmethod
+    def _use_participants(cls, values, live=True):
+        participants = ParticipantIndex(values)
+        # Marks accepted but not yet flushed are missing from the sheet read
+        for (row, col), value in cls.attendance_buffer.pending_cells().items():
+            participants.set_value(row, col, str(value))
+        participants.name_index()  # Build it here rather than on the first name lookup
+        cls._participants = participants
+        cls._live = live
+        return participants
 
     @classmethod
     def __find_member_row_by_telegram_id(cls, telegram_id):
-        """Finds a user by Telegram ID and returns their row as a dictionary."""
+        """Finds a user by Telegram ID and returns their row number."""
         try:
-            headers = cls.participants_sheet.row_values(1) 
-            telegram_col_index = headers.index("Telegram ID") + 1  # Convert to 1-based index
-            cell = cls.participants_sheet.find(str(telegram_id), in_column=telegram_col_index)
-            if not cell:
+            cell_row = cls.participants().find_row("telegram_id", telegram_id)
+            if not cell_row:
                 raise ValueError(f"Telegram ID {telegram_id} not found.")
-            return cell.row
+            return cell_row
         except ValueError as ve:
             raise ve  # Handle specific "not found" cases separately if needed
         except Exception as e:
@@ -118,11 +364,9 @@ class Repository(BaseRepository):
     def get_member_by_telegram_id(cls, telegram_id):
         """Finds a user by Telegram ID and returns their row as a dictionary."""
         try:
-            headers = cls.participants_sheet.row_values(1) 
             cell_row = cls.__find_member_row_by_telegram_id(telegram_id)
-            user_row = cls.participants_sheet.row_values(cell_row)
             # Convert row values into a dictionary using column names
-            return dict(zip(headers, user_row))
+            return cls.participants().record(cell_row)
         except ValueError as ve:
             raise ve  # Handle specific "not found" cases separately if needed
         except Exception as e:
@@ -132,152 +376,184 @@ class Repository(BaseRepository):
     @classmethod
     def find_member_by_telegram_id(cls, telegram_id):
         """Checks if the Telegram ID exists in the Google Sheet"""
-        headers = cls.participants_sheet.row_values(1)
-        try:
-            col_index = headers.index("Telegram ID") + 1  # 1-based index for gspread
-        except ValueError:
+        participants = cls.participants()
+        if "Telegram ID" not in participants.headers:
             raise RuntimeError("Telegram ID column not found in sheet headers")
-        telegram_ids = cls.participants_sheet.col_values(col_index)
-        telegram_ids = telegram_ids[1:]  
-        return str(telegram_id) in telegram_ids
+        return participants.find_row("telegram_id", telegram_id) is not None
 
     @classmethod
     def find_participant_by_name(cls, telegram_name):
-        """Finds a user by name and updates their Telegram ID"""
-        headers = cls.participants_sheet.row_values(1)
-        try:
-            col_index = headers.index("Full Name") + 1  # 1-based index for gspread
-        except ValueError:
+        """Finds a participant's row by an exact match of their Telegram name."""
+        participants = cls.participants()
+        if "Full Name" not in participants.headers:
             raise RuntimeError("Full Name column not found in sheet headers")
-        full_names = cls.participants_sheet.col_values(col_index)
-        # full_name_parts = set(telegram_name.strip().lower().split())
-        name_parts =  telegram_name.strip().lower().split()
-
-        tg_first_name = name_parts[0]
-        tg_last_name = "".join(name_parts[1:]) if len(name_parts) > 1 else ""
-        
-        full_name_parts = tg_first_name.strip().split() + tg_last_name.strip().split()
-        full_name_parts = set(full_name_parts)
-
-        for i, name in enumerate(full_names, start=1):
-            names = name.strip().lower().split()
-            last_first = set(names[:2])
-            last_middle = set()
-            everything = set()
-            if len(names) > 2:
-                last_middle = {names[0], names[2]}
-                everything = set(names)
-            if last_first == full_name_parts or last_middle == full_name_parts or everything == full_name_parts:
-                return i
+        row = participants.name_index().find(telegram_name)
+        if row:
+            return row
         return False
+
+    @classmethod
+    def suggest_participants_by_name(cls, telegram_name, limit=3):
+        """Returns the full names of unlinked participants whose names are close to a Telegram name.
+
+        Only suggestions for the user to confirm by correcting their Telegram name; a fuzzy match is
+        never linked, since it may be somebody else. Empty unless name_match_threshold is set.
+        """
+        if not Config.name_match_threshold:
+            return []
+        participants = cls.participants()
+        if "Full Name" not in participants.headers:
+            return []
+        name_col = participants.column("Full Name")
+        linked = participants.column("Telegram ID") if "Telegram ID" in participants.headers else None
+        return [
+            participants.value(row, name_col)
+            for row, score in participants.name_index().search(telegram_name)
+            if score >= Config.name_match_threshold and not (linked and participants.value(row, linked))
+        ][:limit]
     
     @classmethod
+    @tracked
     def update_telegram_id(cls, telegram_name, telegram_id):
         """Finds a user by name and updates their Telegram ID"""
+        cls.live_participants()
         if cls.telegram_id_exists(telegram_id):
             return True
         name_row = cls.find_participant_by_name(telegram_name)
         if name_row:
-                cls.participants_sheet.update_cell(name_row, 4, telegram_id)  
+                participants = cls.participants()
+                telegram_col_index = participants.column("Telegram ID")
+                cls.storage.update_cells("participants", [(name_row, telegram_col_index, telegram_id)])
+                participants.set_value(name_row, telegram_col_index, str(telegram_id))
                 return True
         return False
     
     @classmethod
     def telegram_id_exists(cls, telegram_id):
-        headers = cls.participants_sheet.row_values(1)
-        try:
-            col_index = headers.index("Telegram ID") + 1  # 1-based index for gspread
-        except ValueError:
-            raise RuntimeError("Telegram ID column not found in sheet headers")
-        telegram_ids = cls.participants_sheet.col_values(col_index)
-        if str(telegram_id) in telegram_ids:
-            return True
-        return False
+        return cls.find_member_by_telegram_id(telegram_id)
     
     @classmethod
+    @tracked
     def create_new_attendance_col(cls):
-        """Creates a new column in Google Sheets for attendance"""
+        """Creates a new column in Google Sheets for attendance and returns its index"""
         date_str = datetime.today().strftime('%b %d')
 
-        # Get the total number of columns in the sheet
-        header = cls.participants_sheet.row_values(1)  # Get header row
-        num_cols = len(header)  
-        new_col_index = num_cols + 1  
-
-        # Expand sheet if needed
-        if new_col_index > cls.participants_sheet.col_count:
-            cls.participants_sheet.add_cols(new_col_index - cls.participants_sheet.col_count)
+        with cls._columns_lock:
+            # Get the total number of columns in the sheet
+            header = cls.storage.get_header("participants")  # Get header row
+            num_cols = len(header)  
+            new_col_index = num_cols + 1  
 
-        # Add the new attendance column
-        cls.participants_sheet.update_cell(1, new_col_index, f"Attendance - {date_str}")
+            # Add the new attendance column; the sheet is expanded if needed
+            cls.storage.update_cells("participants", [(1, new_col_index, f"Attendance - {date_str}")])
+            cls.participants().set_header(new_col_index, f"Attendance - {date_str}")
 
         return new_col_index 
 
 
     @classmethod
-    def mark_attendance(cls, telegram_id, marks=10):
-        """Finds a user by Telegram ID and assigns attendance marks in the latest column if not already marked."""
+    def mark_attendance(cls, telegram_id, marks=10, column=None):
+        """Finds a user by Telegram ID and assigns attendance marks in a column if not already marked.
+
+        column is the session's attendance column; the latest column is used when it is not given.
+        The mark is buffered and written to the sheet by flush_attendance.
+        """
         
         try:
-            headers = cls.participants_sheet.row_values(1)
-            telegram_col_index = headers.index("Telegram ID") + 1  # 1-based index for gspread
-            cell = cls.participants_sheet.find(str(telegram_id), in_column=telegram_col_index)  # Locate Telegram ID by header
-            headers = cls.participants_sheet.row_values(1)  # Get column headers
-            last_col_index = len(headers)  # Identify the last attendance column
+            participants = cls.live_participants()
+            cell_row = participants.find_row("telegram_id", telegram_id)  # Locate Telegram ID in the index
+            if not cell_row:
+                raise ValueError(f"Telegram ID {telegram_id} not found.")
+            col_index = column or len(participants.headers)  # Identify the attendance column
             
             # Check if attendance is already marked
-            existing_mark = cls.participants_sheet.cell(cell.row, last_col_index).value
+            existing_mark = participants.value(cell_row, col_index)
             if existing_mark:  # If there's already a value, don't overwrite
                 return False  # Attendance already marked
             
             # Mark attendance
-            cls.participants_sheet.update_cell(cell.row, last_col_index, marks)
+            if not cls.attendance_buffer.mark(cell_row, col_index, marks):
+                return False  # Marked by an earlier tap that is not flushed yet
+            participants.set_value(cell_row, col_index, str(marks))
             return True  # Successfully marked
+        except ValueError:
+            raise  # Telegram ID is not linked
         except Exception as e:
             raise Exception(f"Error marking attendance for Telegram ID {telegram_id}: {str(e)}")
+
+    @classmethod
+    @tracked
+    def flush_attendance(cls):
+        """Writes buffered attendance marks to the participants sheet in one batch."""
+        return cls.attendance_buffer.flush(lambda cells: cls.storage.update_cells("participants", cells))
     
     @classmethod
+    def finish_attendance(cls, column):
+        """Writes buffered marks and drops the duplicate-tap tracking of a finished session's column."""
+        try:
+            return cls.flush_attendance()
+        finally:
+            cls.attendance_buffer.forget(column)
+
+    @classmethod
+    @tracked
     def count_last_attendance(cls):
         """
         Finds the last attendance column and counts the number of non-empty rows.
         
         :return: Total rows with values in the last attendance column
         """
-        headers = cls.participants_sheet.row_values(1)  # Get column headers
-        last_attendance_col = len(headers)  # Identify the last attendance column
+        cls.flush_attendance()  # Count marks that are still buffered too
+        values = cls.storage.get_values("participants")
+        last_attendance_col = len(header_of(values))  # Identify the last attendance column
         
-        col_values = cls.participants_sheet.col_values(last_attendance_col)  # Get values in that column
+        col_values = [row[last_attendance_col - 1] if len(row) >= last_attendance_col else "" for row in values]
         non_empty_rows = len([val for val in col_values if val.strip()])  # Count non-empty rows
         
         return non_empty_rows - 1
  
+    @classmethod
+    @tracked
+    def import_participants(cls, path, chunk_size=None):
+        """Upserts the participants in a CSV file by email and returns the import counts."""
+        return ParticipantImporter(cls, chunk_size or Config.import_chunk_size).run(path)
+
+    @classmethod
+    def linked_telegram_ids(cls):
+        """Returns the distinct Telegram IDs linked in the participants sheet, in sheet order."""
+        ids = {}
+        for _, value in cls.participants().column_values("Telegram ID"):
+            value = str(value).strip()
+            if value.lstrip("-").isdigit():
+                ids.setdefault(int(value), None)
+        return list(ids)
+
     @classmethod
     def find_participant_by_payment_reference(cls, payment_reference):
         """Finds a user by payment reference and returns their email and row number."""
-        headers = cls.participants_sheet.row_values(1)
-        try:
-            ref_col_index = headers.index("Payment Reference") + 1  # 1-based index
-        except ValueError:
+        participants = cls.participants()
+        if "Payment Reference" not in participants.headers:
             raise Exception("Payment Reference column not found in participants sheet.")
-        cell = cls.participants_sheet.find(str(payment_reference), in_column=ref_col_index)
-        if not cell:
+        cell_row = participants.find_row("payment_reference", payment_reference)
+        if not cell_row:
             return None, None
-        email_col_index = headers.index("Email address") + 1
-        email = cls.participants_sheet.cell(cell.row, email_col_index).value
-        return email, cell.row
+        email = participants.record(cell_row).get("Email address")
+        return email, cell_row
 
     @classmethod
+    @tracked
     def update_telegram_id_by_email(cls, email, telegram_id):
         """Updates the Telegram ID for a user identified by email."""
-        headers = cls.participants_sheet.row_values(1)
+        participants = cls.live_participants()
         try:
-            email_col_index = headers.index("Email address") + 1
-            telegram_col_index = headers.index("Telegram ID") + 1
+            participants.column("Email address")
+            telegram_col_index = participants.column("Telegram ID")
         except ValueError:
             raise Exception("Email address or Telegram ID column not found in participants sheet.")
-        cell = cls.participants_sheet.find(str(email), in_column=email_col_index)
-        if not cell:
+        cell_row = participants.find_row("email", email)
+        if not cell_row:
             return False
-        cls.participants_sheet.update_cell(cell.row, telegram_col_index, telegram_id)
+        cls.storage.update_cells("participants", [(cell_row, telegram_col_index, telegram_id)])
+        participants.set_value(cell_row, telegram_col_index, str(telegram_id))
         return True
  
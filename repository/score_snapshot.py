@@ -0,0 +1,30 @@
+import itertools
+
+from repository.participant_index import normalize_email
+from repository.storage import header_of
+
+
+class ScoreSnapshot:
+    """In-memory copy of the score sheet keyed by email, with the course total from score_rules."""
+
+    versions = itertools.count(1)
+
+    def __init__(self, score_values, rules_values):
+        self.version = next(self.versions)
+        self.headers = header_of(score_values)
+        self.rows = {}  # email -> row of score values
+        if "Email address" in self.headers:
+            email_index = self.headers.index("Email address")
+            for row in score_values[1:]:
+                email = normalize_email(row[email_index]) if len(row) > email_index else ""
+                if email and email not in self.rows:  # First match wins, like Worksheet.find
+                    self.rows[email] = list(row)
+        # Cell D2 of score_rules holds the total
+        self.total_score = rules_values[1][3] if len(rules_values) > 1 and len(rules_values[1]) > 3 else None
+
+    def scores(self, email):
+        """Returns {header: value} for the row of email, or None if it has no row."""
+        row = self.rows.get(normalize_email(email))
+        if row is None:
+            return None
+        return {header: row[i] if i < len(row) else "N/A" for i, header in enumerate(self.headers)}
@@ -0,0 +1,71 @@
+import logging
+import random
+import time
+
+import requests
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+
+import metrics
+from config import Config
+from rate_limit import TokenBucket
+from repository.cache import SingleFlight
+
+
+class QuotaAwareHTTPClient(HTTPClient):
+    """gspread HTTP client that stays inside the Sheets per-minute quotas.
+
+    Requests wait on a read or write token bucket, 429 and 5xx responses are retried with
+    jittered exponential backoff, and identical concurrent reads share a single request.
+    Requests that are not idempotent, such as appending rows, are retried on 429 only: after a 5xx
+    or a dropped connection the write may have been applied, and a retry would apply it twice.
+    """
+
+    retry_statuses = (429, 500, 502, 503, 504)
+    # values.append and spreadsheet batchUpdate (inserting rows or columns) repeat their effect; values.update does not
+    non_idempotent_suffixes = (":append", ":batchUpdate")
+    # Quotas are per service account, so every client shares the same buckets
+    read_bucket = TokenBucket(Config.sheets_reads_per_minute / 60, Config.sheets_reads_per_minute)
+    write_bucket = TokenBucket(Config.sheets_writes_per_minute / 60, Config.sheets_writes_per_minute)
+    reads_in_flight = SingleFlight()
+    logger = logging.getLogger(__name__)
+
+    def request(self, method, endpoint, params=None, data=None, json=None, files=None, headers=None):
+        if method.lower() != "get" or files:
+            return self._request_with_retry(self.write_bucket, method, endpoint, params, data, json, files, headers)
+        key = (endpoint, repr(sorted(params.items())) if params else "", repr(headers))
+        return self.reads_in_flight.do(
+            key, lambda: self._request_with_retry(self.read_bucket, method, endpoint, params, data, json, files, headers)
+        )
+
+    @classmethod
+    def idempotent(cls, method, endpoint):
+        """Tells whether sending a request twice has the same effect as sending it once."""
+        if method.lower() != "post":
+            return True
+        return endpoint.endswith("/values:batchUpdate") or not endpoint.endswith(cls.non_idempotent_suffixes)
+
+    def _request_with_retry(self, bucket, method, endpoint, params, data, json, files, headers):
+        idempotent = self.idempotent(method, endpoint)
+        for attempt in range(Config.sheets_max_retries + 1):
+            bucket.acquire()
+            started = time.monotonic()
+            try:
+                return super().request(method, endpoint, params=params, data=data, json=json, files=files, headers=headers)
+            except APIError as e:
+                # A 429 was rejected before anything was written, so it is safe to retry either way
+                status = e.response.status_code
+                retry = status == 429 or (idempotent and status in self.retry_statuses)
+                if not retry or attempt == Config.sheets_max_retries:
+                    raise
+                error = e
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not idempotent or attempt == Config.sheets_max_retries:
+                    raise
+                error = e
+            finally:
+                metrics.record_sheets_call(method, endpoint, time.monotonic() - started)
+            # Full jitter keeps retries from many threads from landing together
+            delay = random.uniform(0, min(Config.sheets_backoff_max, Config.sheets_backoff_base * 2 ** attempt))
+            self.logger.warning(f"Sheets {method.upper()} {endpoint} failed ({error}), retrying in {delay:.1f}s")
+            time.sleep(delay)
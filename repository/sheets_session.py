@@ -0,0 +1,121 @@
+import datetime
+import logging
+import socket
+import threading
+import time
+
+import requests
+from google.auth.transport.requests import AuthorizedSession, Request
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPSConnectionPool
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        started = time.monotonic()
+        super().connect()
+        metrics.sheets_connect_latency.observe(time.monotonic() - started)
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPS adapter keeping up to pool_size keep-alive connections per host.
+
+    Threads wait for a free connection instead of opening one that is thrown away afterwards, and
+    TCP keep-alive probes every keepalive seconds stop idle connections being dropped on the way.
+    """
+
+    def __init__(self, pool_size, keepalive):
+        self.keepalive = keepalive
+        super().__init__(pool_connections=4, pool_maxsize=pool_size, pool_block=True)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self.keepalive:
+            pool_kwargs["socket_options"] = HTTPConnection.default_socket_options + keepalive_options(self.keepalive)
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = dict(self.poolmanager.pool_classes_by_scheme, https=TimedHTTPSConnectionPool)
+
+
+def keepalive_options(seconds):
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    if hasattr(socket, "TCP_KEEPIDLE"):  # Linux; other platforms keep their system defaults
+        options += [(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, seconds), (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, seconds)]
+    return options
+
+
+class TimedRequest(Request):
+    """Token request transport that reports how long every token refresh takes."""
+
+    def __call__(self, *args, **kwargs):
+        started = time.monotonic()
+        try:
+            return super().__call__(*args, **kwargs)
+        finally:
+            metrics.sheets_token_refresh_latency.observe(time.monotonic() - started)
+
+
+class SheetsSession(AuthorizedSession):
+    """AuthorizedSession with a sized keep-alive connection pool and a token refreshed ahead of time.
+
+    A background thread refreshes the access token refresh_margin seconds before it expires, well
+    before google-auth would refresh it inline on the next request. Every refresh, including the
+    ones google-auth starts inside request(), runs under refresh_lock. A thread that waited on
+    another's refresh uses that token instead of fetching one more.
+    """
+
+    def __init__(self, credentials, pool_size, keepalive, refresh_margin, retry_interval=30):
+        token_session = requests.Session()
+        token_session.mount("https://", HTTPAdapter(max_retries=3))
+        super().__init__(credentials, auth_request=TimedRequest(token_session))
+        self.mount("https://", PooledAdapter(pool_size, keepalive))
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.refresh_lock = threading.Lock()
+        self._refresh = credentials.refresh
+        credentials.refresh = self._locked_refresh  # before_request and the 401 retry call it
+        metrics.sheets_token_ttl.set_function(self.token_ttl)
+
+    def start(self):
+        thread = threading.Thread(target=self._run, name="sheets-token", daemon=True)
+        thread.start()
+        return thread
+
+    def token_ttl(self):
+        """Returns the seconds until the access token expires, 0 if there is none yet."""
+        expiry = self.credentials.expiry
+        if not self.credentials.token or expiry is None:
+            return 0
+        # google-auth keeps expiry as naive UTC
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return max(0.0, (expiry - now).total_seconds())
+
+    def refresh_token(self):
+        self._locked_refresh(self._auth_request)
+
+    def _locked_refresh(self, request):
+        token = self.credentials.token
+        with self.refresh_lock:
+            if self.credentials.token != token and self.credentials.valid:
+                return  # Refreshed by another thread while this one waited
+            self._refresh(request)
+
+    def _run(self):
+        while True:
+            wait = self.token_ttl() - self.refresh_margin
+            if wait <= 0:
+                try:
+                    self.refresh_token()
+                    wait = max(self.token_ttl() - self.refresh_margin, self.retry_interval)
+                except Exception as e:
+                    # Requests still refresh inline if the token runs out before the next attempt
+                    logger.warning('Refreshing the Sheets access token failed, retrying in %ss: "%s"', self.retry_interval, e)
+                    wait = self.retry_interval
+            time.sleep(wait)
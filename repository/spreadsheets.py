@@ -0,0 +1,54 @@
+import threading
+from collections import OrderedDict
+
+import metrics
+
+
+class SpreadsheetCache:
+    """Open spreadsheets and their worksheet handles, shared by every repository on one client.
+
+    At most max_open spreadsheets stay open; the least recently used one is dropped past that.
+    Spreadsheet IDs outlive their handles, so reopening a dropped spreadsheet skips the Drive
+    search that client.open does. Opening a spreadsheet also lists all of its worksheets in one
+    request instead of fetching the metadata again for every worksheet.
+    """
+
+    def __init__(self, client, max_open):
+        self.client = client
+        self.max_open = max_open
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # spreadsheet name -> (spreadsheet, {title: worksheet})
+        self.keys = {}  # spreadsheet name -> spreadsheet ID
+        self.open_locks = {}
+
+    def spreadsheet(self, name):
+        return self._entry(name)[0]
+
+    def worksheet(self, name, title):
+        spreadsheet, worksheets = self._entry(name)
+        if title not in worksheets:
+            # Added after the spreadsheet was opened
+            worksheets[title] = spreadsheet.worksheet(title)
+        return worksheets[title]
+
+    def _entry(self, name):
+        with self.lock:
+            if name in self.entries:
+                self.entries.move_to_end(name)
+                metrics.cache_requests.labels("spreadsheets", "hit").inc()
+                return self.entries[name]
+            open_lock = self.open_locks.setdefault(name, threading.Lock())
+        with open_lock:
+            with self.lock:
+                if name in self.entries:  # Opened by another thread while we waited
+                    return self.entries[name]
+            metrics.cache_requests.labels("spreadsheets", "miss").inc()
+            key = self.keys.get(name)
+            spreadsheet = self.client.open_by_key(key) if key else self.client.open(name)
+            worksheets = {worksheet.title: worksheet for worksheet in spreadsheet.worksheets()}
+            with self.lock:
+                self.keys[name] = spreadsheet.id
+                self.entries[name] = (spreadsheet, worksheets)
+                while len(self.entries) > self.max_open:
+                    self.entries.popitem(last=False)
+                return self.entries[name]
@@ -0,0 +1,276 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from gspread.utils import ValueInputOption, numericise_all, rowcol_to_a1
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sheet_rows (
+    sheet TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (sheet, row)
+);
+CREATE TABLE IF NOT EXISTS sheet_meta (
+    sheet TEXT PRIMARY KEY,
+    pulled_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sheet TEXT NOT NULL,
+    op TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+def make_storage(owner):
+    """Returns the storage backend selected by Config.storage_backend for a repository."""
+    if Config.storage_backend == "sqlite":
+        storage = SqliteStorage(owner.sheets, owner.local_path(Config.sqlite_path))
+        storage.start(Config.sqlite_sync_interval, Config.sqlite_pull_interval)
+        return storage
+    return owner.sheets
+
+
+def records(values):
+    """Turns sheet values into dictionaries keyed by the header, like Worksheet.get_all_records."""
+    if not values:
+        return []
+    header = values[0]
+    return [
+        dict(zip(header, numericise_all(list(row) + [""] * (len(header) - len(row)))))
+        for row in values[1:]
+    ]
+
+
+def header_of(values):
+    """Returns the header row of sheet values without trailing blank cells."""
+    header = list(values[0]) if values else []
+    while header and header[-1] == "":
+        header.pop()
+    return header
+
+
+class SheetsStorage:
+    """Reads and writes the spreadsheet directly. Every call is a Sheets request."""
+
+    def __init__(self, owner):
+        self.owner = owner
+
+    def worksheet(self, sheet):
+        return self.owner.spreadsheets.worksheet(self.owner.spreadsheet_name, sheet)
+
+    def get_values(self, sheet):
+        return self.worksheet(sheet).get_all_values()
+
+    def get_many(self, sheets):
+        """Returns {sheet: values} for several sheets, fetched with a single values_batch_get."""
+        # A bare sheet name selects the whole sheet; quotes keep names with spaces valid
+        ranges = ["'{}'".format(sheet.replace("'", "''")) for sheet in sheets]
+        response = self.owner.gsheet.values_batch_get(ranges)
+        return {
+            sheet: value_range.get("values", [])
+            for sheet, value_range in zip(sheets, response.get("valueRanges", []))
+        }
+
+    def get_header(self, sheet):
+        return self.worksheet(sheet).row_values(1)
+
+    def update_cells(self, sheet, cells):
+        """Writes (row, col, value) cells, adding columns to the sheet when a cell is past its edge."""
+        worksheet = self.worksheet(sheet)
+        last_col = max(col for _, col, _ in cells)
+        if last_col > worksheet.col_count:
+            worksheet.add_cols(last_col - worksheet.col_count)
+        if len(cells) == 1:
+            worksheet.update_cell(*cells[0])
+        else:
+            data = [{"range": rowcol_to_a1(row, col), "values": [[value]]} for row, col, value in cells]
+            worksheet.batch_update(data, value_input_option=ValueInputOption.user_entered)
+
+    def append_rows(self, sheet, rows):
+        self.worksheet(sheet).append_rows(rows, value_input_option=ValueInputOption.user_entered)
+
+    def refresh(self):
+        pass
+
+
+class SqliteStorage:
+    """Local SQLite mirror of the spreadsheet.
+
+    Reads are served from the mirror; a sheet is pulled from Sheets the first time it is read.
+    Writes are applied to the mirror and queued in an outbox that sync() replays into the
+    spreadsheet in batches. pull() brings back edits made directly in the sheet.
+    """
+
+    def __init__(self, remote, path):
+        self.remote = remote
+        self.lock = threading.RLock()  # Guards the connection
+        self.sync_lock = threading.Lock()  # Keeps sync and pull from interleaving
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def start(self, sync_interval, pull_interval):
+        """Starts the background thread that syncs the outbox and pulls sheet edits."""
+        thread = threading.Thread(
+            target=self._run, args=(sync_interval, pull_interval), name="sqlite-syncer", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def get_values(self, sheet):
+        return self.get_many([sheet])[sheet]
+
+    def get_many(self, sheets):
+        with self.lock:
+            missing = [sheet for sheet in sheets if not self._mirrored(sheet)]
+        if missing:
+            self.pull(missing)  # Outside the lock; pull waits for any sync in progress
+        with self.lock:
+            return {sheet: self._values(sheet) for sheet in sheets}
+
+    def get_header(self, sheet):
+        return header_of(self.get_values(sheet))
+
+    def update_cells(self, sheet, cells):
+        cells = [list(cell) for cell in cells]
+        with self.lock, self.db:
+            for row, col, value in cells:
+                self._set_cell(sheet, row, col, value)
+            self._enqueue(sheet, "update", cells)
+
+    def append_rows(self, sheet, rows):
+        rows = [[str(value) for value in row] for row in rows]
+        with self.lock, self.db:
+            self._append(sheet, rows)
+            self._enqueue(sheet, "append", rows)
+
+    def pending(self):
+        """Returns how many writes are waiting in the outbox."""
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def sync(self):
+        """Replays the outbox into the spreadsheet and returns how many writes were sent.
+
+        Consecutive writes to the same sheet are sent together. A failed write stays in the
+        outbox, with everything after it, for the next sync.
+        """
+        with self.sync_lock:
+            with self.lock:
+                entries = self.db.execute("SELECT id, sheet, op, payload FROM outbox ORDER BY id").fetchall()
+            sent = 0
+            while entries:
+                _, sheet, op, _ = entries[0]
+                batch = []
+                while entries and entries[0][1:3] == (sheet, op):
+                    batch.append(entries.pop(0))
+                payloads = [json.loads(payload) for _, _, _, payload in batch]
+                if op == "update":
+                    cells = {}
+                    for payload in payloads:
+                        for row, col, value in payload:
+                            cells.pop((row, col), None)  # Keep the last write in order
+                            cells[(row, col)] = value
+                    self.remote.update_cells(sheet, [(row, col, value) for (row, col), value in cells.items()])
+                else:
+                    self.remote.append_rows(sheet, [row for payload in payloads for row in payload])
+                with self.lock, self.db:
+                    self.db.executemany("DELETE FROM outbox WHERE id = ?", [(entry[0],) for entry in batch])
+                sent += len(batch)
+            return sent
+
+    def pull(self, sheets=None):
+        """Reloads sheets from the spreadsheet with one request, every mirrored sheet by default.
+
+        Writes still in the outbox are applied again on top, so they don't disappear until synced.
+        """
+        with self.sync_lock:
+            if sheets is None:
+                with self.lock:
+                    sheets = [sheet for (sheet,) in self.db.execute("SELECT sheet FROM sheet_meta")]
+            if not sheets:
+                return
+            values = self.remote.get_many(sheets)
+            with self.lock, self.db:
+                for sheet, rows in values.items():
+                    self.db.execute("DELETE FROM sheet_rows WHERE sheet = ?", (sheet,))
+                    self.db.executemany(
+                        "INSERT INTO sheet_rows (sheet, row, data) VALUES (?, ?, ?)",
+                        [(sheet, number, json.dumps(row)) for number, row in enumerate(rows, start=1)],
+                    )
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO sheet_meta (sheet, pulled_at) VALUES (?, ?)", (sheet, time.time())
+                    )
+                placeholders = ",".join("?" * len(values))
+                pending = self.db.execute(
+                    f"SELECT sheet, op, payload FROM outbox WHERE sheet IN ({placeholders}) ORDER BY id", list(values)
+                ).fetchall()
+                for sheet, op, payload in pending:
+                    if op == "update":
+                        for row, col, value in json.loads(payload):
+                            self._set_cell(sheet, row, col, value)
+                    else:
+                        self._append(sheet, json.loads(payload))
+
+    def refresh(self):
+        """Sends pending writes and pulls every mirrored sheet."""
+        self.sync()
+        self.pull()
+
+    def _run(self, sync_interval, pull_interval):
+        last_pull = time.monotonic()
+        while True:
+            time.sleep(sync_interval)
+            try:
+                self.sync()
+                if time.monotonic() - last_pull >= pull_interval:
+                    self.pull()
+                    last_pull = time.monotonic()
+            except Exception as e:
+                logger.warning("Syncing the SQLite mirror failed, retrying in %ss: %s", sync_interval, e)
+
+    def _mirrored(self, sheet):
+        return self.db.execute("SELECT 1 FROM sheet_meta WHERE sheet = ?", (sheet,)).fetchone() is not None
+
+    def _values(self, sheet):
+        rows = self.db.execute("SELECT data FROM sheet_rows WHERE sheet = ? ORDER BY row", (sheet,))
+        return [json.loads(data) for (data,) in rows]
+
+    def _set_cell(self, sheet, row, col, value):
+        found = self.db.execute("SELECT data FROM sheet_rows WHERE sheet = ? AND row = ?", (sheet, row)).fetchone()
+        if found is None:
+            # Fill the gap so row numbers keep matching the sheet
+            last = self.db.execute("SELECT COALESCE(MAX(row), 0) FROM sheet_rows WHERE sheet = ?", (sheet,)).fetchone()[0]
+            self.db.executemany(
+                "INSERT INTO sheet_rows (sheet, row, data) VALUES (?, ?, '[]')",
+                [(sheet, number) for number in range(last + 1, row + 1)],
+            )
+            data = []
+        else:
+            data = json.loads(found[0])
+        data.extend([""] * (col - len(data)))
+        data[col - 1] = str(value)
+        self.db.execute("UPDATE sheet_rows SET data = ? WHERE sheet = ? AND row = ?", (json.dumps(data), sheet, row))
+
+    def _append(self, sheet, rows):
+        last = self.db.execute("SELECT COALESCE(MAX(row), 0) FROM sheet_rows WHERE sheet = ?", (sheet,)).fetchone()[0]
+        self.db.executemany(
+            "INSERT INTO sheet_rows (sheet, row, data) VALUES (?, ?, ?)",
+            [(sheet, last + offset, json.dumps(row)) for offset, row in enumerate(rows, start=1)],
+        )
+
+    def _enqueue(self, sheet, op, payload):
+        self.db.execute(
+            "INSERT INTO outbox (sheet, op, payload, created_at) VALUES (?, ?, ?, ?)",
+            (sheet, op, json.dumps(payload), time.time()),
+        )
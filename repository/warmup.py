@@ -0,0 +1,56 @@
+import logging
+import threading
+import time
+
+
+class Warmup:
+    """Opens Sheets handles in a background thread and records how long each step took.
+
+    A failed step is retried after retry_interval seconds, so a Sheets outage at boot
+    only delays readiness instead of crashing the process.
+    """
+
+    def __init__(self, retry_interval=30):
+        self.retry_interval = retry_interval
+        self.logger = logging.getLogger(__name__)
+        self.state = "pending"
+        self.latencies = {}  # step name -> seconds
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    def start(self, steps):
+        threading.Thread(target=self._run, args=(list(steps),), name="sheets-warmup", daemon=True).start()
+
+    def _run(self, steps):
+        self.state = "warming"
+        self.started_at = time.time()
+        while steps:
+            name, step = steps[0]
+            started = time.monotonic()
+            try:
+                step()
+            except Exception as e:
+                self.error = f"{name}: {e}"
+                self.logger.warning(f"Warm-up step {name} failed, retrying in {self.retry_interval}s: {e}")
+                time.sleep(self.retry_interval)
+                continue
+            self.latencies[name] = round(time.monotonic() - started, 3)
+            steps.pop(0)
+        self.error = None
+        self.state = "ready"
+        self.finished_at = time.time()
+        self.logger.info(f"Warm-up finished: {self.latencies}")
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def report(self):
+        return {
+            "state": self.state,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "sheets_latency_seconds": dict(self.latencies),
+        }
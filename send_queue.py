@@ -0,0 +1,147 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from telegram.error import RetryAfter, TelegramError
+
+import metrics
+from rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Lower numbers are sent first
+ANSWER, MODERATION, NOTICE, BROADCAST = range(4)
+
+
+class SendQueue:
+    """Sends Telegram API calls from a background thread within Telegram's rate limits.
+
+    Calls wait in a priority queue and are sent, oldest first within a priority, once the global
+    bucket and the bucket of their chat allow it. Group chats get group_rate messages a minute,
+    private chats private_rate a second. A RetryAfter puts the call back for as long as Telegram
+    asks, and holds its chat too.
+
+    ANSWER calls skip the queue: a pool of answer_workers threads sends them as soon as the global
+    bucket allows, so callback answers keep up with the handlers instead of waiting on one thread's
+    round-trips.
+    """
+
+    def __init__(self, global_rate, group_rate, private_rate, max_retries, answer_workers=4):
+        # Buckets hold a single token so the limits are never exceeded in a burst
+        self.global_bucket = TokenBucket(global_rate, 1)
+        self.group_rate = group_rate / 60
+        self.private_rate = private_rate
+        self.max_retries = max_retries
+        self.chat_buckets = {}
+        self.held = {}  # chat_id -> monotonic time it may send again
+        self.queue = []  # heap of [priority, order, chat_id, method, args, kwargs, future, attempts, not_before]
+        self.order = itertools.count()
+        self.condition = threading.Condition()
+        self.answers = ThreadPoolExecutor(max_workers=answer_workers, thread_name_prefix="send-answer")
+        metrics.send_queue_depth.set_function(lambda: len(self.queue))
+
+    def start(self):
+        thread = threading.Thread(target=self._run, name="send-queue", daemon=True)
+        thread.start()
+        return thread
+
+    def submit(self, priority, chat_id, method, *args, **kwargs):
+        """Queues method(*args, **kwargs) and returns a Future of its result."""
+        future = Future()
+        if priority == ANSWER:
+            self.answers.submit(self._answer, method, args, kwargs, future)
+            return future
+        with self.condition:
+            heapq.heappush(self.queue, [priority, next(self.order), chat_id, method, args, kwargs, future, 0, 0])
+            self.condition.notify()
+        return future
+
+    def _answer(self, method, args, kwargs, future):
+        for attempt in range(self.max_retries + 1):
+            self.global_bucket.acquire()
+            try:
+                future.set_result(method(*args, **kwargs))
+                return
+            except RetryAfter as e:
+                metrics.telegram_errors.labels("RetryAfter").inc()
+                if attempt == self.max_retries:
+                    future.set_exception(e)
+                    return
+                time.sleep(e.retry_after)
+            except Exception as e:
+                self._failed(method, None, e, future)
+                return
+
+    def _run(self):
+        while True:
+            with self.condition:
+                entry, wait = self._next()
+                if entry is None:
+                    self.condition.wait(wait)
+                    continue
+            self._send(entry)
+
+    def _next(self):
+        """Pops the first call its chat may send now, or returns (None, seconds until one may)."""
+        now = time.monotonic()
+        skipped = []
+        entry = wait = None
+        try:
+            while self.queue:
+                candidate = heapq.heappop(self.queue)
+                chat_id = candidate[2]
+                # A call Telegram asked to retry waits on its own, and on its chat if it has one
+                chat_wait = max(candidate[8], self.held.get(chat_id, 0)) - now
+                if chat_wait <= 0:
+                    chat_wait = 0
+                    if chat_id is not None:
+                        self.held.pop(chat_id, None)
+                        chat_wait = self._bucket(chat_id).try_acquire()
+                if not chat_wait:
+                    entry = candidate
+                    break
+                skipped.append(candidate)
+                wait = chat_wait if wait is None else min(wait, chat_wait)
+        finally:
+            for candidate in skipped:
+                heapq.heappush(self.queue, candidate)
+        return entry, wait
+
+    def _bucket(self, chat_id):
+        if chat_id not in self.chat_buckets:
+            # Group and channel IDs are negative
+            rate = self.group_rate if int(chat_id) < 0 else self.private_rate
+            self.chat_buckets[chat_id] = TokenBucket(rate, 1)
+        return self.chat_buckets[chat_id]
+
+    def _send(self, entry):
+        priority, order, chat_id, method, args, kwargs, future, attempts, _ = entry
+        self.global_bucket.acquire()
+        try:
+            result = method(*args, **kwargs)
+        except RetryAfter as e:
+            metrics.telegram_errors.labels("RetryAfter").inc()
+            if attempts >= self.max_retries:
+                future.set_exception(e)
+                return
+            logger.warning("Telegram asked to retry %s in %ss", getattr(method, "__name__", method), e.retry_after)
+            not_before = time.monotonic() + e.retry_after
+            with self.condition:
+                if chat_id is not None:
+                    self.held[chat_id] = not_before
+                heapq.heappush(self.queue, [priority, order, chat_id, method, args, kwargs, future, attempts + 1, not_before])
+            return
+        except Exception as e:
+            self._failed(method, chat_id, e, future)
+            return
+        future.set_result(result)
+
+    @staticmethod
+    def _failed(method, chat_id, error, future):
+        if isinstance(error, TelegramError):
+            metrics.telegram_errors.labels(type(error).__name__).inc()
+        logger.warning('Sending %s to %s failed: "%s"', getattr(method, "__name__", method), chat_id, error)
+        future.set_exception(error)
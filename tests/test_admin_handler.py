@@ -0,0 +1,65 @@
+import unittest
+from unittest import mock
+
+from config import Config
+from handlers.admin_handler import AdminHandler
+
+
+def command(text, user_id, chat_id=-100, status="creator"):
+    update = mock.Mock()
+    update.effective_user.id = user_id
+    update.effective_chat.id = chat_id
+    update.effective_chat.type = "supergroup"
+    update.message.text = text
+    context = mock.Mock()
+    context.bot.get_chat_member.return_value = {"status": status}
+    return update, context
+
+
+class BroadcastTest(unittest.TestCase):
+    def setUp(self):
+        self.bot = mock.Mock()
+        self.bot.repository_for.return_value.linked_telegram_ids.return_value = [1, 2]
+        self.handler = AdminHandler(self.bot, mock.Mock())
+        patcher = mock.patch.object(Config, "admin_ids", [42])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_group_admin_not_in_admin_ids_is_refused(self):
+        update, context = command("/broadcast hello", user_id=7, status="creator")
+        self.handler.broadcast(update, context)
+        update.message.reply_text.assert_called_once_with("This command can be executed by admin only")
+        self.bot.send_queue.submit.assert_not_called()
+
+    def test_configured_admin_broadcasts_to_linked_participants(self):
+        update, context = command("/broadcast hello", user_id=42)
+        self.handler.broadcast(update, context)
+        self.assertEqual(self.bot.send_queue.submit.call_count, 2)
+
+
+
+class RefreshTest(unittest.TestCase):
+    def setUp(self):
+        self.repository = mock.Mock()
+        bot = mock.Mock()
+        bot.cohorts.repositories.return_value = [self.repository]
+        self.handler = AdminHandler(bot, mock.Mock())
+        patcher = mock.patch.multiple(Config, admin_ids=[42], refresh_cooldown=60)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_group_admin_not_in_admin_ids_is_refused(self):
+        update, context = command("/refresh", user_id=7, status="administrator")
+        self.handler.refresh(update, context)
+        self.repository.refresh.assert_not_called()
+
+    def test_second_refresh_within_cooldown_is_refused(self):
+        for _ in range(2):
+            update, context = command("/refresh", user_id=42)
+            self.handler.refresh(update, context)
+        self.repository.refresh.assert_called_once()
+        self.assertIn("Try again", update.message.reply_text.call_args[0][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,11 @@
 import re
 
+from config import Config
+
 def escape_markdown(text):
         """Escapes special characters in Markdown text to avoid parsing errors."""
-        return re.sub(r'([_*[\]()~`>#+-=|{}.!])', r'\\\1', text)
\ No newline at end of file
+        return re.sub(r'([_*[\]()~`>#+-=|{}.!])', r'\\\1', text)
+
+def is_bot_admin(update):
+        """Checks if the user is a configured bot admin. Group admins are not, since anyone can own a group with the bot in it."""
+        return update.effective_user.id in Config.admin_ids